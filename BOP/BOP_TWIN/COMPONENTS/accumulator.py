@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AccumulatorLumpedParams:
     name: str
     V_eff_m3: float  # volume equivalente compressível do nó do acumulador
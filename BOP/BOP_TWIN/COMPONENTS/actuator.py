@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActuatorVolumeParams:
     name: str
     V_m3: float  # volume compressível do nó do atuador
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Sequence
+import math
 import numpy as np
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OrificeValveParams:
     name: str
     cd: float = 0.62
@@ -20,10 +22,128 @@ class OrificeValveParams:
     allow_reverse_flow: bool = False
     reverse_flow_gain: float = 1.0
 
+
+def _orifice_flow(
+    p_up: float,
+    p_dn: float,
+    rho: float,
+    opening: float,
+    cd: float,
+    area: float,
+    min_op: float,
+    max_op: float,
+    dP_threshold: float,
+    gain_fwd: float,
+    allow_rev: bool,
+    gain_rev: float,
+    tau_scale: float,
+    atten_coeff: float,
+) -> float:
+    """
+    Scalar orifice flow kernel (m3/s). Plain float math only: this is called
+    once per ODE right-hand-side evaluation, so it avoids NumPy scalar dispatch.
+    Parameter-only terms (threshold, clipped gains, attenuation constants) are
+    precomputed by OrificeValve.
+    """
+    opening = min(max(opening, min_op), max_op)
+    raw_dP = p_up - p_dn
+    if not allow_rev and raw_dP < 0.0:
+        raw_dP = 0.0
+
+    direction = 1.0 if raw_dP > 0.0 else (-1.0 if raw_dP < 0.0 else 0.0)
+    dP = abs(raw_dP)
+    A = area * opening
+    if dP <= 0.0 or A <= 0.0 or direction == 0.0:
+        return 0.0
+
+    dP_effective = dP - dP_threshold
+    if dP_effective <= 0.0:
+        return 0.0
+
+    q = cd * A * math.sqrt(2.0 * dP_effective / rho)
+
+    gain = gain_rev if direction < 0.0 else gain_fwd
+    if atten_coeff > 0.0:
+        tau_w = dP * tau_scale
+        gain *= math.exp(-atten_coeff / max(tau_w, 1e-9))
+
+    return direction * gain * q
+
+
+def _orifice_dflow_ddp(
+    p_up: float,
+    p_dn: float,
+    rho: float,
+    opening: float,
+    cd: float,
+    area: float,
+    min_op: float,
+    max_op: float,
+    dP_threshold: float,
+    gain_fwd: float,
+    allow_rev: bool,
+    gain_rev: float,
+    tau_scale: float,
+    atten_coeff: float,
+    dP_eps: float = 1e4,
+) -> float:
+    """
+    dQ/d(p_up - p_dn) of _orifice_flow (m3/s per Pa), always >= 0.
+    The 1/sqrt(dP) slope is capped below dP_eps: near equalization the exact
+    slope blows up and only makes the Newton iteration matrix ill-conditioned.
+    """
+    opening = min(max(opening, min_op), max_op)
+    raw_dP = p_up - p_dn
+    if not allow_rev and raw_dP < 0.0:
+        raw_dP = 0.0
+
+    dP = abs(raw_dP)
+    A = area * opening
+    if dP <= 0.0 or A <= 0.0:
+        return 0.0
+
+    dP_effective = dP - dP_threshold
+    if dP_effective <= 0.0:
+        return 0.0
+
+    # d/d(dP) [cd*A*sqrt(2*dP_eff/rho)] = cd*A / sqrt(2*rho*dP_eff)
+    dq = cd * A / math.sqrt(2.0 * rho * max(dP_effective, dP_eps))
+
+    gain = gain_rev if raw_dP < 0.0 else gain_fwd
+    if atten_coeff > 0.0:
+        tau_w = dP * tau_scale
+        attenuation = math.exp(-atten_coeff / max(tau_w, 1e-9))
+        if tau_w > 1e-9:
+            # attenuation = exp(-k/dP), k = atten_coeff/tau_scale -> slope attenuation*k/dP^2
+            q = cd * A * math.sqrt(2.0 * dP_effective / rho)
+            dq = dq * attenuation + q * attenuation * (atten_coeff / tau_scale) / (dP * dP)
+        else:
+            dq *= attenuation
+
+    return gain * dq
+
+
 class OrificeValve:
     def __init__(self, params: OrificeValveParams):
         self.p = params
 
+        # parameter-only terms, evaluated once instead of on every RHS call
+        p = params
+        d = max(float(p.hydraulic_diameter_m), 1e-9)
+        l = max(float(p.equivalent_length_m), 1e-9)
+        self._dP_threshold = max(float(p.min_delta_p_pa), self._yield_delta_p_threshold_pa())
+        # direction-selected gains: reverse flow scales the clipped transmission gain
+        self._gain_fwd = min(max(float(p.transmission_gain), 0.0), 1.0)
+        self._gain_rev = self._gain_fwd * max(float(p.reverse_flow_gain), 0.0)
+        self._tau_scale = d / (4.0 * l)  # tau_w = dP * D / (4 * L)
+        self._inertia_ratio = max(float(p.inertia_dissipation_ratio), 1e-9)
+        self._use_attenuation = p.attenuation_alpha > 0.0 and p.yield_stress_pa > 0.0
+        self._atten_coeff = (
+            float(p.attenuation_alpha) * float(p.yield_stress_pa) / self._inertia_ratio
+            if self._use_attenuation
+            else 0.0
+        )
+
     def _yield_delta_p_threshold_pa(self) -> float:
         # Circular tube wall stress: tau_w = dP * D / (4 * L)
         # Pressure transmission starts when tau_w > tau0 -> dP > 4*L*tau0/D
@@ -34,34 +154,92 @@ class OrificeValve:
         return (4.0 * l * float(self.p.yield_stress_pa)) / d
 
     def flow_m3s(self, p_up_pa: float, p_dn_pa: float, rho: float, opening: float) -> float:
-        opening = float(np.clip(opening, self.p.min_opening, self.p.max_opening))
-        raw_dP = float(p_up_pa) - float(p_dn_pa)
-        if not self.p.allow_reverse_flow:
-            raw_dP = max(raw_dP, 0.0)
-
-        direction = float(np.sign(raw_dP))
-        dP = abs(raw_dP)
-        A = self.p.area_m2 * opening
-        if dP <= 0.0 or A <= 0.0 or direction == 0.0:
-            return 0.0
+        p = self.p
+        return _orifice_flow(
+            float(p_up_pa), float(p_dn_pa), float(rho), float(opening),
+            p.cd, p.area_m2, p.min_opening, p.max_opening, self._dP_threshold,
+            self._gain_fwd, p.allow_reverse_flow, self._gain_rev, self._tau_scale, self._atten_coeff,
+        )
 
-        dP_threshold = max(float(self.p.min_delta_p_pa), self._yield_delta_p_threshold_pa())
-        dP_effective = max(dP - dP_threshold, 0.0)
-        if dP_effective <= 0.0:
-            return 0.0
+    def dflow_ddp(self, p_up_pa: float, p_dn_pa: float, rho: float, opening: float) -> float:
+        p = self.p
+        return _orifice_dflow_ddp(
+            float(p_up_pa), float(p_dn_pa), float(rho), float(opening),
+            p.cd, p.area_m2, p.min_opening, p.max_opening, self._dP_threshold,
+            self._gain_fwd, p.allow_reverse_flow, self._gain_rev, self._tau_scale, self._atten_coeff,
+        )
+
+
+class ValveBank:
+    """
+    Structure-of-arrays view over N orifice valves: each parameter is one
+    float array, so all N flows come out of a single vectorized evaluation.
+    Same physics as OrificeValve.flow_m3s, element by element.
+    The bank is bound to one fluid density, given at construction.
+    """
+
+    def __init__(self, params: Sequence[OrificeValveParams], rho: float):
+        valves = [OrificeValve(p) for p in params]
+        self.params = tuple(params)
+        self.names = tuple(p.name for p in self.params)
+        self.cd = np.array([v.p.cd for v in valves], dtype=float)
+        self.area_m2 = np.array([v.p.area_m2 for v in valves], dtype=float)
+        self.min_opening = np.array([v.p.min_opening for v in valves], dtype=float)
+        self.max_opening = np.array([v.p.max_opening for v in valves], dtype=float)
+        self.allow_reverse_flow = np.array([v.p.allow_reverse_flow for v in valves], dtype=bool)
+        self.dP_threshold = np.array([v._dP_threshold for v in valves], dtype=float)
+        self.gain_fwd = np.array([v._gain_fwd for v in valves], dtype=float)
+        self.gain_rev = np.array([v._gain_rev for v in valves], dtype=float)
+        self.tau_scale = np.array([v._tau_scale for v in valves], dtype=float)
+        self.atten_coeff = np.array([v._atten_coeff for v in valves], dtype=float)
+        self._use_attenuation = bool(np.any(self.atten_coeff > 0.0))
+        # q = cd * A * sqrt(2/rho) * sqrt(dP_eff): the rho factor is fixed per bank
+        self.rho = float(rho)
+        self._sqrt_2_over_rho = math.sqrt(2.0 / self.rho)
+
+    def __len__(self) -> int:
+        return len(self.params)
+
+    def flow_m3s(self, p_up_pa, p_dn_pa, opening) -> np.ndarray:
+        opening = np.clip(opening, self.min_opening, self.max_opening)
+        raw_dP = np.asarray(p_up_pa, dtype=float) - np.asarray(p_dn_pa, dtype=float)
+        raw_dP = np.where(self.allow_reverse_flow | (raw_dP >= 0.0), raw_dP, 0.0)
+
+        dP = np.abs(raw_dP)
+        A = self.area_m2 * opening
+        dP_effective = np.maximum(dP - self.dP_threshold, 0.0)
+        q = (self.cd * self._sqrt_2_over_rho) * np.maximum(A, 0.0) * np.sqrt(dP_effective)
+
+        gain = np.where(raw_dP < 0.0, self.gain_rev, self.gain_fwd)
+        if self._use_attenuation:
+            tau_w = np.maximum(dP * self.tau_scale, 1e-9)
+            gain = gain * np.exp(-self.atten_coeff / tau_w)
+
+        return np.sign(raw_dP) * gain * q
+
+    def dflow_ddp(self, p_up_pa, p_dn_pa, opening, dP_eps: float = 1e4) -> np.ndarray:
+        """
+        Element-wise OrificeValve.dflow_ddp (same slope cap below dP_eps).
+        """
+        opening = np.clip(opening, self.min_opening, self.max_opening)
+        raw_dP = np.asarray(p_up_pa, dtype=float) - np.asarray(p_dn_pa, dtype=float)
+        raw_dP = np.where(self.allow_reverse_flow | (raw_dP >= 0.0), raw_dP, 0.0)
+
+        dP = np.abs(raw_dP)
+        A = self.area_m2 * opening
+        dP_effective = dP - self.dP_threshold
+        active = (dP > 0.0) & (A > 0.0) & (dP_effective > 0.0)
+
+        # d/dP [sqrt(2/rho) * sqrt(x)] = sqrt(2/rho) / (2 * sqrt(x))
+        cd_k = self.cd * self._sqrt_2_over_rho
+        dq = (0.5 * cd_k) * np.maximum(A, 0.0) / np.sqrt(np.maximum(dP_effective, dP_eps))
+        if self._use_attenuation:
+            tau_w = dP * self.tau_scale
+            attenuation = np.exp(-self.atten_coeff / np.maximum(tau_w, 1e-9))
+            q = cd_k * np.maximum(A, 0.0) * np.sqrt(np.maximum(dP_effective, 0.0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                slope = q * attenuation * (self.atten_coeff / self.tau_scale) / (dP * dP)
+            dq = np.where(tau_w > 1e-9, dq * attenuation + slope, dq * attenuation)
 
-        q = self.p.cd * A * np.sqrt(2.0 * dP_effective / float(rho))
-
-        gain = float(np.clip(self.p.transmission_gain, 0.0, 1.0))
-        if direction < 0.0:
-            gain *= max(float(self.p.reverse_flow_gain), 0.0)
-        if self.p.attenuation_alpha > 0.0 and self.p.yield_stress_pa > 0.0:
-            d = max(float(self.p.hydraulic_diameter_m), 1e-9)
-            l = max(float(self.p.equivalent_length_m), 1e-9)
-            tau_w = dP * d / (4.0 * l)
-            bingham_like = float(self.p.yield_stress_pa) / max(tau_w, 1e-9)
-            lambda_ratio = max(float(self.p.inertia_dissipation_ratio), 1e-9)
-            attenuation = float(np.exp(-float(self.p.attenuation_alpha) * bingham_like / lambda_ratio))
-            gain *= attenuation
-
-        return direction * gain * q
+        gain = np.where(raw_dP < 0.0, self.gain_rev, self.gain_fwd)
+        return np.where(active, gain * dq, 0.0)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Callable, Dict, Any, Optional, Sequence, Union
 import numpy as np
 
 try:
-    from scipy.integrate import solve_ivp
+    from scipy.integrate import odeint, solve_ivp
 except ImportError as e:
     raise ImportError("Instale scipy: pip install scipy") from e
 
@@ -20,11 +21,17 @@ def integrate_ode(
     rtol: float = 1e-6,
     atol: float = 1e-9,
     verbose: bool = False,
+    jac: Optional[Callable[[float, np.ndarray], np.ndarray]] = None,
+    t_eval_is_sanitized: bool = False,
+    use_dense_output: bool = False,
 ) -> Dict[str, Any]:
     y0 = np.asarray(y0, dtype=float)
 
     if t_eval is None:
         t_eval = np.linspace(t_span[0], t_span[1], 1000)
+    elif t_eval_is_sanitized:
+        # caller guarantees: float array, sorted, unique, inside t_span
+        pass
     else:
         t_eval = np.asarray(t_eval, dtype=float)
         # garante que t_eval está dentro de t_span (evita ValueError)
@@ -33,37 +40,109 @@ def integrate_ode(
         # ordena e remove duplicatas (por segurança)
         t_eval = np.unique(t_eval)
 
+    if method == "odeint":
+        # LSODA stepping loop runs in compiled code (no per-step Python
+        # bookkeeping as in solve_ivp); cheap for 1-2 state systems.
+        # odeint converts sequence returns in C, so the user fun is called
+        # directly, without the Python wrapper below.
+        return _integrate_odeint(fun, y0, t_span, t_eval, rtol, atol, verbose, jac=jac)
+
     def _fun(t, y):
         dy = fun(t, y)
-        return np.asarray(dy, dtype=float)
+        # float64 arrays go straight through; lists/tuples are converted once
+        if type(dy) is np.ndarray and dy.dtype == np.float64:
+            return dy
+        return np.array(dy, dtype=np.float64)
 
+    options = {} if jac is None else {"jac": jac}
     sol = solve_ivp(
         fun=_fun,
         t_span=(float(t_span[0]), float(t_span[1])),
         y0=y0,
-        t_eval=t_eval,
+        # dense output: the solver takes its natural steps and the requested
+        # times are sampled from the interpolant afterwards
+        t_eval=None if use_dense_output else t_eval,
         method=method,
         rtol=rtol,
         atol=atol,
+        dense_output=use_dense_output,
+        **options,
     )
 
     if verbose:
         print(f"[integrate_ode] success={sol.success} message={sol.message}")
 
+    if use_dense_output:
+        if sol.sol is None:
+            return {"t": t_eval[:0], "y": np.empty((len(y0), 0)), "success": False, "message": str(sol.message)}
+        t_out = t_eval[t_eval <= sol.t[-1]] if not sol.success else t_eval
+        return {"t": t_out, "y": sol.sol(t_out), "success": bool(sol.success), "message": str(sol.message)}
+
     return {"t": sol.t, "y": sol.y, "success": bool(sol.success), "message": str(sol.message)}
 
+def _integrate_odeint(
+    fun: OdeFun,
+    y0: np.ndarray,
+    t_span: tuple[float, float],
+    t_eval: np.ndarray,
+    rtol: float,
+    atol: float,
+    verbose: bool,
+    band: Optional[tuple[int, int]] = None,
+    jac: Optional[Callable[[float, np.ndarray], np.ndarray]] = None,
+) -> Dict[str, Any]:
+    # odeint treats the first grid point as the initial time
+    t0 = float(t_span[0])
+    prepend = len(t_eval) == 0 or t_eval[0] > t0
+    t_grid = np.concatenate(([t0], t_eval)) if prepend else t_eval
+
+    ml, mu = band if band is not None else (None, None)
+    y, info = odeint(
+        fun, y0, t_grid, Dfun=jac, tfirst=True, rtol=rtol, atol=atol, full_output=True, ml=ml, mu=mu
+    )
+    if prepend:
+        y = y[1:]
+
+    message = str(info["message"])
+    success = message == "Integration successful."
+    if verbose:
+        print(f"[integrate_ode] success={success} message={message}")
+
+    if not success:
+        # rows after the failure point are never written: keep the prefix the
+        # solver actually reached (tcur[i] is the time reached for t_grid[i + 1]),
+        # so the output is truncated like solve_ivp's
+        reached = info["tcur"] >= t_grid[1:]
+        n_ok = len(reached) if reached.all() else int(np.argmin(reached))
+        n_valid = n_ok if prepend else n_ok + 1
+        t_eval = t_eval[:n_valid]
+        y = y[:n_valid]
+
+    # t_eval may be a cached read-only grid: hand the caller its own copy
+    return {"t": t_eval.copy(), "y": y.T, "success": success, "message": message}
+
+@lru_cache(maxsize=32)
+def _hold_time_grid(t_end: float, dt_s: float) -> np.ndarray:
+    # sorted/unique by construction; last point clipped so it never exceeds t_end
+    t = np.arange(0.0, t_end + 1e-12, dt_s)
+    np.minimum(t, t_end, out=t)
+    t.setflags(write=False)
+    return t
+
 def run_hold_test(
     fun: OdeFun,
     p0_pa: float,
     t_hold_min: float = 5.0,
     dt_s: float = 0.5,
     pass_drop_percent: float = 1.0,
-    method: str = "RK45",
+    method: str = "odeint",
 ) -> Dict[str, Any]:
     t_end = float(t_hold_min) * 60.0
-    t_eval = np.arange(0.0, t_end + 1e-12, float(dt_s))
+    t_eval = _hold_time_grid(t_end, float(dt_s))
 
-    sol = integrate_ode(fun=fun, y0=[float(p0_pa)], t_span=(0.0, t_end), t_eval=t_eval, method=method)
+    sol = integrate_ode(
+        fun=fun, y0=[float(p0_pa)], t_span=(0.0, t_end), t_eval=t_eval, method=method, t_eval_is_sanitized=True
+    )
 
     p_end = float(sol["y"][0, -1])
     delta_p_percent = (float(p0_pa) - p_end) / float(p0_pa) * 100.0
@@ -78,4 +157,52 @@ def run_hold_test(
         "pass_drop_percent": float(pass_drop_percent),
         "success": sol["success"],
         "message": sol["message"],
-    }
\ No newline at end of file
+    }
+
+def run_hold_test_batch(
+    fun: OdeFun,
+    p0_pa: ArrayLike,
+    t_hold_min: float = 5.0,
+    dt_s: float = 0.5,
+    pass_drop_percent: float = 1.0,
+    method: str = "odeint",
+    dtype: Any = np.float64,
+) -> Dict[str, Any]:
+    """
+    Hold test for N independent cases integrated as one vector ODE.
+    fun(t, P) must be vectorized: P has shape (N,) and dP/dt is returned
+    with the same shape. Results are per-case arrays (index = case).
+    dtype sets the storage of the returned trajectories "p" (e.g. float32
+    for large sweeps); integration and delta_p_percent stay in float64.
+    """
+    p0 = np.asarray(p0_pa, dtype=float).ravel()
+    t_end = float(t_hold_min) * 60.0
+    t_eval = _hold_time_grid(t_end, float(dt_s))
+
+    if method == "odeint":
+        # cases are uncoupled -> diagonal Jacobian (band 0/0): one extra RHS
+        # call per Jacobian instead of N
+        sol = _integrate_odeint(
+            fun,
+            p0, (0.0, t_end), t_eval, rtol=1e-6, atol=1e-9, verbose=False, band=(0, 0),
+        )
+    else:
+        sol = integrate_ode(
+            fun=fun, y0=p0, t_span=(0.0, t_end), t_eval=t_eval, method=method, t_eval_is_sanitized=True
+        )
+
+    p = sol["y"]
+    p_end = p[:, -1].copy()
+    delta_p_percent = (p0 - p_end) / p0 * 100.0
+
+    return {
+        "t": sol["t"],
+        "p": p.astype(dtype, copy=False),
+        "p0_pa": p0,
+        "p_end_pa": p_end,
+        "delta_p_percent": delta_p_percent,
+        "pass": delta_p_percent <= float(pass_drop_percent),
+        "pass_drop_percent": float(pass_drop_percent),
+        "success": sol["success"],
+        "message": sol["message"],
+    }
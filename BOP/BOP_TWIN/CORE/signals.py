@@ -10,14 +10,60 @@ def ddt(t: np.ndarray, x: np.ndarray) -> np.ndarray:
 def d2dt2(t: np.ndarray, x: np.ndarray) -> np.ndarray:
     return ddt(t, ddt(t, x))
 
+def ddt_uniform(x: np.ndarray, dt: float, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Central differences on a uniform grid (same values as np.gradient:
+    one-sided first-order differences at the edges), without the
+    non-uniform spacing machinery.
+    """
+    x = np.asarray(x, dtype=float)
+    dx = np.empty_like(x) if out is None else out
+    np.subtract(x[2:], x[:-2], out=dx[1:-1])
+    dx[1:-1] *= 0.5 / dt
+    dx[0] = (x[1] - x[0]) / dt
+    dx[-1] = (x[-1] - x[-2]) / dt
+    return dx
+
+def is_sorted(t: np.ndarray) -> bool:
+    """
+    True if t is non-decreasing (NaN comparisons do not count as out of order).
+    Pairwise compare instead of np.diff: no float temporary.
+    """
+    return not np.any(t[1:] < t[:-1])
+
+def _uniform_step(t: np.ndarray) -> float | None:
+    if len(t) < 3:
+        return None
+    dt = float(t[1] - t[0])
+    # tolerance relative to the step: an absolute atol would accept visibly
+    # jittered grids when dt is small
+    if dt <= 0.0 or not np.all(np.abs(np.diff(t) - dt) <= 1e-6 * dt):
+        return None
+    return dt
+
 def basic_features(t: np.ndarray, p: np.ndarray) -> dict:
-    dp = ddt(t, p)
-    d2p = d2dt2(t, p)
+    t = np.asarray(t, dtype=float)
+    p = np.asarray(p, dtype=float)
+
+    # rows: p, dp/dt, d2p/dt2 -> one min and one max reduction over the block
+    rows = np.empty((3, len(p)))
+    rows[0] = p
+    dt = _uniform_step(t)
+    if dt is not None:
+        # gradient of the gradient, same stencil as d2dt2 on the non-uniform path
+        ddt_uniform(p, dt, out=rows[1])
+        ddt_uniform(rows[1], dt, out=rows[2])
+    else:
+        rows[1] = ddt(t, p)
+        rows[2] = d2dt2(t, p)
+
+    lo = rows.min(axis=1)
+    hi = rows.max(axis=1)
     return {
-        "p_min": float(np.min(p)),
-        "p_max": float(np.max(p)),
-        "dp_min": float(np.min(dp)),
-        "dp_max": float(np.max(dp)),
-        "d2p_min": float(np.min(d2p)),
-        "d2p_max": float(np.max(d2p)),
-    }
\ No newline at end of file
+        "p_min": float(lo[0]),
+        "p_max": float(hi[0]),
+        "dp_min": float(lo[1]),
+        "dp_max": float(hi[1]),
+        "d2p_min": float(lo[2]),
+        "d2p_max": float(hi[2]),
+    }
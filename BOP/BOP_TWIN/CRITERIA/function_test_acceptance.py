@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Any, List, Literal
+import numpy as np
 
 ActuatorType = Literal["annular", "ram"]
 
@@ -43,36 +44,34 @@ def _evaluate_regulators(
     if not regulator_records:
         return {"ok": True, "fails": [], "covered_setpoints_psi": []}
 
-    fails = []
-    covered = []
-    setpoints = [float(x) for x in spec.regulator_setpoints_psi]
+    setpoints = np.asarray(spec.regulator_setpoints_psi, dtype=float)
     tol_psi = 25.0
 
-    for target in setpoints:
-        if any(abs(float(r.get("setpoint_psi", -1e9)) - target) <= tol_psi for r in regulator_records):
-            covered.append(target)
-        else:
-            fails.append(
-                {
-                    "type": "missing_regulator_setpoint",
-                    "setpoint_psi": target,
-                    "tolerance_psi": tol_psi,
-                }
-            )
-
-    low_candidates = [
-        float(r.get("measured_psi"))
-        for r in regulator_records
-        if abs(float(r.get("setpoint_psi", -1e9)) - min(setpoints)) <= tol_psi
-    ]
-    high_candidates = [
-        float(r.get("measured_psi"))
-        for r in regulator_records
-        if abs(float(r.get("setpoint_psi", -1e9)) - max(setpoints)) <= tol_psi
+    setp = np.array([float(r.get("setpoint_psi", -1e9)) for r in regulator_records])
+    meas = np.array(
+        [np.nan if r.get("measured_psi") is None else float(r.get("measured_psi")) for r in regulator_records]
+    )
+    # match[i, j]: record i exercised setpoint j
+    match = np.abs(setp[:, None] - setpoints[None, :]) <= tol_psi
+    hit = match.any(axis=0)
+
+    covered = setpoints[hit].tolist()
+    fails = [
+        {
+            "type": "missing_regulator_setpoint",
+            "setpoint_psi": target,
+            "tolerance_psi": tol_psi,
+        }
+        for target in setpoints[~hit].tolist()
     ]
 
-    if low_candidates:
-        low_measured = min(low_candidates)
+    low_candidates = meas[match[:, int(np.argmin(setpoints))]]
+    low_candidates = low_candidates[~np.isnan(low_candidates)]
+    high_candidates = meas[match[:, int(np.argmax(setpoints))]]
+    high_candidates = high_candidates[~np.isnan(high_candidates)]
+
+    if low_candidates.size:
+        low_measured = float(low_candidates.min())
         if low_measured > float(spec.regulator_min_allowed_psi):
             fails.append(
                 {
@@ -82,8 +81,8 @@ def _evaluate_regulators(
                 }
             )
 
-    if high_candidates:
-        high_measured = max(high_candidates)
+    if high_candidates.size:
+        high_measured = float(high_candidates.max())
         if high_measured < float(spec.regulator_max_allowed_psi):
             fails.append(
                 {
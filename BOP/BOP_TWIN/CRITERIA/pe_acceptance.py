@@ -1,6 +1,12 @@
 import numpy as np
 from bop_twin.criteria.pressure_acceptance_v2 import PressureTestSpec, evaluate_pressure_test
 
+def _as_float_array(a) -> np.ndarray:
+    a = np.asarray(a)
+    if a.dtype == np.float32 or a.dtype == np.float64:
+        return a
+    return a.astype(np.float64)
+
 def acceptance_hold_drop(
     t: np.ndarray,
     p: np.ndarray,
@@ -18,8 +24,9 @@ def acceptance_hold_drop(
     Aqui eu deixei ainda o método antigo (percentual).
     Você pode migrar por etapas: criar uma acceptance_hold_drop_v2 ao lado.
     """
-    t = np.asarray(t, dtype=float)
-    p = np.asarray(p, dtype=float)
+    # float32/float64 inputs keep their precision (no upcast copy); anything else -> float64
+    t = _as_float_array(t)
+    p = _as_float_array(p)
 
     # método antigo preservado (não quebra testes existentes)
     t_end = t[-1]
@@ -41,6 +48,7 @@ def acceptance_hold_drop(
             designated_pressure_psi=designated_pressure_psi,
             rwp_psi=rwp_psi,
             pressure_unit=pressure_unit,  # pa/psi/bar
+            dtype=p.dtype,
         )
         out["petrobras"] = {
             "ok": bool(result.ok),
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, Literal, Dict, Any, Tuple
+from typing import Optional, Literal, Dict, Any, List, Tuple
 import numpy as np
 
+from bop_twin.core.signals import is_sorted
+
 TestMode = Literal["low", "high"]
 PressureUnit = Literal["psi", "pa", "bar"]
 
@@ -43,22 +46,25 @@ class PressureTestResult:
     details: Dict[str, Any]
 
 
-def _as_np(a) -> np.ndarray:
-    x = np.asarray(a, dtype=float)
+def _as_np(a, dtype: Any = float) -> np.ndarray:
+    x = np.asarray(a, dtype=dtype)
     if x.ndim != 1:
         raise ValueError("time and pressure must be 1D sequences")
     return x
 
 
-def _to_psi(pressure: np.ndarray, pressure_unit: PressureUnit) -> np.ndarray:
-    unit = str(pressure_unit).lower()
-    if unit == "psi":
-        return pressure
-    if unit == "pa":
-        return pressure / 6894.75729
-    if unit == "bar":
-        return pressure * 14.5037738
-    raise ValueError(f"Unsupported pressure unit: {pressure_unit}")
+# multiplicative factor unit -> psi
+_PSI_SCALE: Dict[str, float] = {"psi": 1.0, "pa": 1.0 / 6894.75729, "bar": 14.5037738}
+
+
+def _psi_scale(pressure_unit: PressureUnit) -> float:
+    scale = _PSI_SCALE.get(pressure_unit)
+    if scale is None:
+        # only non-canonical spellings ("PSI", "Pa") pay for the lower()
+        scale = _PSI_SCALE.get(str(pressure_unit).lower())
+        if scale is None:
+            raise ValueError(f"Unsupported pressure unit: {pressure_unit}")
+    return scale
 
 
 def _rolling_median(x: np.ndarray, window: int) -> np.ndarray:
@@ -67,35 +73,110 @@ def _rolling_median(x: np.ndarray, window: int) -> np.ndarray:
     No scipy dependency.
     """
     if window <= 1:
-        return x.copy()
+        return x
     w = int(window)
     if w % 2 == 0:
         w += 1
     pad = w // 2
-    xp = np.pad(x, (pad, pad), mode="edge")
-    out = np.empty_like(x)
-    for i in range(len(x)):
-        out[i] = np.median(xp[i:i + w])
-    return out
-
-
-def _window_indices(t: np.ndarray, t_end: float, duration_s: float) -> np.ndarray:
+    n = x.shape[-1]
+    # edge padding written directly (same as np.pad mode="edge", without its dispatch);
+    # works along the last axis, so a (B, n) batch is smoothed row by row
+    xp = np.empty(x.shape[:-1] + (n + 2 * pad,), dtype=x.dtype)
+    xp[..., pad:pad + n] = x
+    xp[..., :pad] = x[..., :1]
+    xp[..., pad + n:] = x[..., -1:]
+    # (..., n, w) strided view of the centered windows, no copy; one median call for all rows
+    windows = np.lib.stride_tricks.sliding_window_view(xp, w, axis=-1)
+    return np.median(windows, axis=-1)
+
+
+def _window_indices(t: np.ndarray, t_end: float, duration_s: float) -> Tuple[int, int]:
+    """
+    [start, stop) bounds of t0 <= t <= t_end on a sorted time vector
+    (binary search instead of a full mask scan).
+    """
     t0 = t_end - duration_s
-    return np.where((t >= t0) & (t <= t_end))[0]
+    start = int(np.searchsorted(t, t0, side="left"))
+    stop = int(np.searchsorted(t, t_end, side="right"))
+    return start, stop
 
 
-def _robust_start_end_mean(t: np.ndarray, p: np.ndarray, idx: np.ndarray) -> Tuple[float, float]:
+def _robust_start_end_mean(p_obs: np.ndarray) -> Tuple[float, float]:
     """
     Compute robust start/end pressure for the observation window:
     average over first 20% and last 20% of points to avoid endpoint noise.
     """
-    n = len(idx)
+    n = len(p_obs)
     if n < 10:
         raise ValueError("Not enough samples inside observation window")
     k = max(3, int(0.2 * n))
-    i0 = idx[:k]
-    i1 = idx[-k:]
-    return float(np.mean(p[i0])), float(np.mean(p[i1]))
+    return float(p_obs[:k].mean()), float(p_obs[-k:].mean())
+
+
+def _prepare_series(
+    t: np.ndarray,
+    p_raw_in: np.ndarray,
+    pressure_unit: PressureUnit,
+    smooth_window: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Numeric preprocessing shared by the acceptance checks: sort by time,
+    convert to psi and median-smooth. Returns (t, p_psi_smoothed).
+    p_raw_in may be (n,) or a (B, n) batch sharing the time vector t.
+    """
+    # Internal calculations in psi (keeps Petrobras criteria directly in psi)
+    scale = _psi_scale(pressure_unit)
+
+    # Sort by time if needed; the reordered copy is converted in place
+    if not is_sorted(t):
+        order = np.argsort(t)
+        t = t[order]
+        p_raw = p_raw_in[..., order]
+        if scale != 1.0:
+            p_raw *= scale
+    else:
+        p_raw = p_raw_in if scale == 1.0 else p_raw_in * scale
+
+    # Smooth to ignore spikes (vale/pico) as recommended by Anexo A
+    # (smoothing off: p aliases p_raw; it is only indexed/reduced afterwards)
+    p = p_raw if smooth_window <= 1 else _rolling_median(p_raw, smooth_window)
+    return t, p
+
+
+# opt-in memo of _prepare_series for sweeps re-evaluating the same arrays:
+# key on object identity; the entry keeps the input arrays alive so ids cannot be reused
+_PREP_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_PREP_CACHE_MAXSIZE = 64
+
+
+def clear_preprocessing_cache() -> None:
+    _PREP_CACHE.clear()
+
+
+def _prepare_series_cached(
+    time_s: np.ndarray,
+    pressure: np.ndarray,
+    pressure_unit: PressureUnit,
+    smooth_window: int,
+    dtype: Any,
+) -> Tuple[np.ndarray, np.ndarray]:
+    key = (id(time_s), id(pressure), pressure.shape, pressure.dtype.str, pressure_unit, int(smooth_window), np.dtype(dtype).str)
+    hit = _PREP_CACHE.get(key)
+    if hit is not None and hit[0] is time_s and hit[1] is pressure:
+        _PREP_CACHE.move_to_end(key)
+        return hit[2], hit[3]
+
+    t, p = _prepare_series(_as_np(time_s), _as_np(pressure, dtype), pressure_unit, smooth_window)
+    _PREP_CACHE[key] = (time_s, pressure, t, p)
+    if len(_PREP_CACHE) > _PREP_CACHE_MAXSIZE:
+        _PREP_CACHE.popitem(last=False)
+    return t, p
+
+
+def _observation_window(t: np.ndarray, p: np.ndarray, duration_s: float) -> np.ndarray:
+    # last duration_s of the (sorted) series, as a view
+    start, stop = _window_indices(t, float(t[-1]), duration_s)
+    return p[start:stop]
 
 
 def _max_overpressure_allowed(rwp_psi: float) -> float:
@@ -128,6 +209,8 @@ def evaluate_pressure_test(
     bop_nominal_pressure_psi: Optional[float] = None,
     fluid_density_kg_m3: Optional[float] = None,
     lda_m: Optional[float] = None,
+    dtype: Any = np.float64,
+    cache_preprocessing: bool = False,
 ) -> PressureTestResult:
     """
     Implements Petrobras Anexo A acceptance logic:
@@ -139,45 +222,75 @@ def evaluate_pressure_test(
     - High pressure must remain above designated pressure during observation;
       if it falls below, repressurize and restart the observation window.
     - Optional RWP overpressure check: cannot exceed RWP + min(5%RWP, 500 psi).
+
+    dtype sets the working precision of the pressure trace (np.float32 halves
+    the memory traffic of the smoothing/reduction passes); time stays float64.
+
+    cache_preprocessing=True memoizes the sorted/converted/smoothed series
+    per (time_s, pressure_psi) ndarray pair, for sweeps that re-evaluate one
+    trace with different specs. The caller must not mutate those arrays
+    while they may be cached (see clear_preprocessing_cache).
     """
     t = _as_np(time_s)
-    p_raw_in = _as_np(pressure_psi)
+    p_raw_in = _as_np(pressure_psi, dtype)
     if len(t) != len(p_raw_in):
         raise ValueError("time_s and pressure_psi must have same length")
     if len(t) < 20:
         return PressureTestResult(False, "series_too_short", {"n": len(t)})
 
-    # Sort by time if needed
-    if np.any(np.diff(t) < 0):
-        order = np.argsort(t)
-        t = t[order]
-        p_raw_in = p_raw_in[order]
-
-    # Internal calculations in psi (keeps Petrobras criteria directly in psi)
-    p_raw = _to_psi(p_raw_in, pressure_unit)
-
-    # Smooth to ignore spikes (vale/pico) as recommended by Anexo A
-    p = _rolling_median(p_raw, smooth_window)
-
+    if cache_preprocessing and isinstance(time_s, np.ndarray) and isinstance(pressure_psi, np.ndarray):
+        t, p = _prepare_series_cached(time_s, pressure_psi, pressure_unit, smooth_window, dtype)
+    else:
+        t, p = _prepare_series(t, p_raw_in, pressure_unit, smooth_window)
+
+    return _evaluate_prepared(
+        t,
+        p,
+        spec,
+        designated_pressure_psi=designated_pressure_psi,
+        rwp_psi=rwp_psi,
+        high_test_justified_below_min=high_test_justified_below_min,
+        bop_nominal_pressure_psi=bop_nominal_pressure_psi,
+        fluid_density_kg_m3=fluid_density_kg_m3,
+        lda_m=lda_m,
+    )
+
+
+def _evaluate_prepared(
+    t: np.ndarray,
+    p: np.ndarray,
+    spec: PressureTestSpec,
+    *,
+    designated_pressure_psi: Optional[float],
+    rwp_psi: Optional[float],
+    high_test_justified_below_min: bool,
+    bop_nominal_pressure_psi: Optional[float],
+    fluid_density_kg_m3: Optional[float],
+    lda_m: Optional[float],
+) -> PressureTestResult:
+    # Anexo A decision logic on a sorted, psi, smoothed series
     obs_s = spec.observation_min * 60.0
-    t_end = float(t[-1])
-    idx = _window_indices(t, t_end, obs_s)
-    if len(idx) < 10:
+    p_obs = _observation_window(t, p, obs_s)
+    if len(p_obs) < 10:
         return PressureTestResult(False, "insufficient_samples_in_observation_window",
-                                  {"observation_s": obs_s, "n_obs": len(idx)})
+                                  {"observation_s": obs_s, "n_obs": len(p_obs)})
 
-    p_start, p_end = _robust_start_end_mean(t, p, idx)
+    p_start, p_end = _robust_start_end_mean(p_obs)
     drop = p_start - p_end  # positive drop means pressure decreased
     rise = p_end - p_start  # positive rise means pressure increased
 
-    # N-2752 / N-2753 optional depth-corrected check
-    if (
+    check_bop = (
         spec.check_measured_bop_pressure
         and bop_nominal_pressure_psi is not None
         and fluid_density_kg_m3 is not None
         and lda_m is not None
-    ):
-        ptest_psi = float(np.max(p))
+    )
+    # whole-trace maximum, shared by the N-2752 and RWP checks (one scan)
+    pmax_all = float(p.max()) if (check_bop or rwp_psi is not None) else None
+
+    # N-2752 / N-2753 optional depth-corrected check
+    if check_bop:
+        ptest_psi = pmax_all
         p_bop_measured_psi = _bop_measured_pressure_psi(
             ptest_psi=ptest_psi,
             fluid_density_kg_m3=float(fluid_density_kg_m3),
@@ -200,7 +313,7 @@ def evaluate_pressure_test(
 
     # Optional overpressure constraint (Anexo A)
     if rwp_psi is not None:
-        pmax = float(np.max(p))
+        pmax = pmax_all
         allowed = rwp_psi + _max_overpressure_allowed(rwp_psi)
         if pmax > allowed:
             return PressureTestResult(
@@ -212,9 +325,8 @@ def evaluate_pressure_test(
     # Mode-specific checks
     if spec.mode == "low":
         # Check if any value in observation window is outside 250..350
-        p_obs = p[idx]
-        pmin_obs = float(np.min(p_obs))
-        pmax_obs = float(np.max(p_obs))
+        pmin_obs = float(p_obs.min())
+        pmax_obs = float(p_obs.max())
 
         # Hard rule: must stay 250..350 throughout observation
         if pmin_obs < spec.low_min_psi or pmax_obs > spec.low_max_psi:
@@ -270,8 +382,7 @@ def evaluate_pressure_test(
                 },
             )
 
-        p_obs = p[idx]
-        pmin_obs = float(np.min(p_obs))
+        pmin_obs = float(p_obs.min())
         if pmin_obs < float(designated_pressure_psi):
             return PressureTestResult(
                 False,
@@ -308,3 +419,50 @@ def evaluate_pressure_test(
         return PressureTestResult(True, "ok", {"p_start": p_start, "p_end": p_end, "drop": drop})
 
     return PressureTestResult(False, "unknown_mode", {"mode": spec.mode})
+
+
+def evaluate_pressure_test_batch(
+    time_s,
+    pressure_batch,
+    spec: PressureTestSpec,
+    *,
+    designated_pressure_psi: Optional[float] = None,
+    rwp_psi: Optional[float] = None,
+    pressure_unit: PressureUnit = "psi",
+    smooth_window: int = 11,
+    high_test_justified_below_min: bool = False,
+    bop_nominal_pressure_psi: Optional[float] = None,
+    fluid_density_kg_m3: Optional[float] = None,
+    lda_m: Optional[float] = None,
+    dtype: Any = np.float64,
+) -> List[PressureTestResult]:
+    """
+    evaluate_pressure_test for B traces sampled on one time vector:
+    pressure_batch has shape (B, n). Sorting, unit conversion and smoothing
+    run once on the whole (B, n) array; the acceptance decision is then taken
+    per row with the same rules. Returns one PressureTestResult per row.
+    """
+    t = _as_np(time_s)
+    P = np.asarray(pressure_batch, dtype=dtype)
+    if P.ndim != 2:
+        raise ValueError("pressure_batch must be a 2D array (B, n)")
+    if P.shape[1] != len(t):
+        raise ValueError("time_s and pressure_batch rows must have same length")
+    if len(t) < 20:
+        return [PressureTestResult(False, "series_too_short", {"n": len(t)}) for _ in range(P.shape[0])]
+
+    t, P = _prepare_series(t, P, pressure_unit, smooth_window)
+    return [
+        _evaluate_prepared(
+            t,
+            p,
+            spec,
+            designated_pressure_psi=designated_pressure_psi,
+            rwp_psi=rwp_psi,
+            high_test_justified_below_min=high_test_justified_below_min,
+            bop_nominal_pressure_psi=bop_nominal_pressure_psi,
+            fluid_density_kg_m3=fluid_density_kg_m3,
+            lda_m=lda_m,
+        )
+        for p in P
+    ]
@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from typing import Dict, Any
 import numpy as np
 
+from bop_twin.core.signals import is_sorted
+
 
 @dataclass(frozen=True)
 class SoakTestSpec:
@@ -15,6 +17,13 @@ class SoakTestSpec:
     min_operation_interval_min: float = 30.0
 
 
+# pump start (psi) -> allowed drop per step (psi)
+_ALLOWED_DROP_TABLE = {2700: 6.0, 4500: 10.0, 4600: 8.0, 4700: 6.0}
+_ALLOWED_DROP_FALLBACK = 6.0
+_ALLOWED_DROP_KEYS = np.array(sorted(_ALLOWED_DROP_TABLE), dtype=float)
+_ALLOWED_DROP_VALS = np.array([_ALLOWED_DROP_TABLE[k] for k in sorted(_ALLOWED_DROP_TABLE)])
+
+
 def allowed_drop_per_step(pump_start_psi: float) -> float:
     """
     PE-1PBR-00051 item 3.1.6:
@@ -23,15 +32,17 @@ def allowed_drop_per_step(pump_start_psi: float) -> float:
     - Pump Start 4600 psi: 8 psi ou menos a cada 5 min
     - Pump Start 4500 psi: 10 psi ou menos a cada 5 min
     """
-    ps = int(round(pump_start_psi))
-    if ps in (2700, 4700):
-        return 6.0
-    if ps == 4600:
-        return 8.0
-    if ps == 4500:
-        return 10.0
     # fallback conservador: usar o mais restritivo
-    return 6.0
+    return _ALLOWED_DROP_TABLE.get(int(round(pump_start_psi)), _ALLOWED_DROP_FALLBACK)
+
+
+def allowed_drop_per_step_vec(pump_start_psi) -> np.ndarray:
+    """
+    Array version of allowed_drop_per_step (same table and fallback).
+    """
+    ps = np.round(np.asarray(pump_start_psi, dtype=float))
+    idx = np.minimum(np.searchsorted(_ALLOWED_DROP_KEYS, ps), len(_ALLOWED_DROP_KEYS) - 1)
+    return np.where(_ALLOWED_DROP_KEYS[idx] == ps, _ALLOWED_DROP_VALS[idx], _ALLOWED_DROP_FALLBACK)
 
 
 def evaluate_soak_test(
@@ -40,17 +51,19 @@ def evaluate_soak_test(
     pump_start_psi: float,
     spec: SoakTestSpec = SoakTestSpec(),
     pump_stop_psi: float | None = None,
+    dtype: Any = np.float64,
 ) -> Dict[str, Any]:
     """
     Checks accumulator pressure decay over 15 minutes.
     Splits into 3 blocks of 5 min and checks drop in each block.
+    dtype sets the working precision of the pressure trace (time stays float64).
     """
     t = np.asarray(time_s, dtype=float)
-    p = np.asarray(acc_pressure_psi, dtype=float)
+    p = np.asarray(acc_pressure_psi, dtype=dtype)
     if t.ndim != 1 or p.ndim != 1 or len(t) != len(p):
         raise ValueError("time_s and acc_pressure_psi must be 1D arrays with same length")
 
-    if np.any(np.diff(t) < 0):
+    if not is_sorted(t):
         order = np.argsort(t)
         t = t[order]
         p = p[order]
@@ -62,26 +75,28 @@ def evaluate_soak_test(
     if t_start < float(t[0]):
         return {"ok": False, "reason": "insufficient_duration", "details": {"required_s": dur_s, "available_s": float(t[-1] - t[0])}}
 
-    # take only last 15 minutes
-    mask = (t >= t_start) & (t <= t_end)
-    t15 = t[mask]
-    p15 = p[mask]
+    # take only last 15 minutes (t is sorted and t_end = t[-1]: a tail slice)
+    i15 = int(np.searchsorted(t, t_start, side="left"))
+    t15 = t[i15:]
+    p15 = p[i15:]
 
     allow = allowed_drop_per_step(pump_start_psi)
 
-    # block checks (0-5, 5-10, 10-15)
+    # block checks (0-5, 5-10, 10-15): [a, b] bounds of every block from two binary searches
+    n_blocks = int(spec.duration_min / spec.step_min)
+    block_a = t_start + np.arange(n_blocks) * step_s
+    lo = np.searchsorted(t15, block_a, side="left")
+    hi = np.searchsorted(t15, block_a + step_s, side="right")
     drops = []
-    for k in range(int(spec.duration_min / spec.step_min)):
-        a = t_start + k * step_s
-        b = a + step_s
-        idx = np.where((t15 >= a) & (t15 <= b))[0]
-        if len(idx) < 5:
-            return {"ok": False, "reason": "insufficient_samples_in_block", "details": {"block": k, "n": int(len(idx))}}
-        p0 = float(np.mean(p15[idx[:max(3, int(0.2 * len(idx)))] ]))
-        p1 = float(np.mean(p15[idx[-max(3, int(0.2 * len(idx))):] ]))
-        drops.append(p0 - p1)
-
-    ok_by_block = all(d <= allow for d in drops)
+    for k, (i0, i1) in enumerate(zip(lo.tolist(), hi.tolist())):
+        nb = i1 - i0
+        if nb < 5:
+            return {"ok": False, "reason": "insufficient_samples_in_block", "details": {"block": k, "n": nb}}
+        kk = max(3, int(0.2 * nb))
+        drops.append(float(p15[i0:i0 + kk].mean()) - float(p15[i1 - kk:i1].mean()))
+
+    drops_arr = np.asarray(drops)
+    ok_by_block = bool(np.all(drops_arr <= allow))
 
     total_drop = float(np.max(p15) - np.min(p15))
     mean_drop_rate_psi_per_min = total_drop / float(spec.duration_min) if spec.duration_min > 0 else 0.0
@@ -91,7 +106,7 @@ def evaluate_soak_test(
         pump_band = max(float(pump_stop_psi) - float(pump_start_psi), 0.0)
         estimated_interval_min = pump_band / mean_drop_rate_psi_per_min
 
-    dubious = any(d > float(spec.dubious_fraction_of_limit) * allow for d in drops)
+    dubious = bool(np.any(drops_arr > float(spec.dubious_fraction_of_limit) * allow))
 
     if (
         ok_by_block
@@ -1,12 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Any
-from bop_twin.faults.faults_base import Fault
+from bop_twin.faults.faults_base import Fault, register_fault
+
+@register_fault("bulk_modulus_drop")
+def apply_bulk_modulus_drop(cfg: Dict[str, Any], factor: float = 0.8) -> Dict[str, Any]:
+    cfg["fluid"]["bulk_modulus"] = float(cfg["fluid"]["bulk_modulus"]) * float(factor)
+    return cfg
 
 @dataclass
 class BulkModulusDropFault(Fault):
     factor: float = 0.8  # ex: 0.8 reduz 20%
 
     def apply(self, cfg: Dict[str, Any]) -> Dict[str, Any]:
-        cfg["fluid"]["bulk_modulus"] = float(cfg["fluid"]["bulk_modulus"]) * float(self.factor)
-        return cfg
\ No newline at end of file
+        return apply_bulk_modulus_drop(cfg, self.factor)
\ No newline at end of file
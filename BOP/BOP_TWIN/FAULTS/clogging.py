@@ -1,7 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
-from bop_twin.faults.faults_base import Fault
+from typing import Dict, Any, Callable
+from bop_twin.faults.faults_base import Fault, register_fault
+
+@register_fault("clogging")
+def apply_clogging(cfg: Dict[str, Any], valve_name: str, area_factor: float = 0.5) -> Dict[str, Any]:
+    v = cfg.get("valves", {}).get(valve_name)
+    if isinstance(v, dict) and v.get("area_m2") is not None:
+        v["area_m2"] = float(v["area_m2"]) * float(area_factor)
+    return cfg
 
 @dataclass
 class CloggingFault(Fault):
@@ -9,7 +16,15 @@ class CloggingFault(Fault):
     area_factor: float = 0.5
 
     def apply(self, cfg: Dict[str, Any]) -> Dict[str, Any]:
+        return apply_clogging(cfg, self.valve_name, self.area_factor)
+
+    def bind(self, cfg: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
         v = cfg.get("valves", {}).get(self.valve_name)
-        if isinstance(v, dict) and v.get("area_m2") is not None:
-            v["area_m2"] = float(v["area_m2"]) * float(self.area_factor)
-        return cfg
\ No newline at end of file
+        if not (isinstance(v, dict) and v.get("area_m2") is not None):
+            return lambda: cfg
+        factor = float(self.area_factor)
+
+        def run() -> Dict[str, Any]:
+            v["area_m2"] = float(v["area_m2"]) * factor
+            return cfg
+        return run
@@ -1,10 +1,63 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
+from importlib import import_module
+from typing import Dict, Any, Callable, Iterable, Tuple, Union
+
+FaultOp = Callable[..., Dict[str, Any]]
+
+# kind (= nome do módulo em bop_twin.faults) -> função apply(cfg, **params)
+FAULT_OPS: Dict[str, FaultOp] = {}
+
+def register_fault(kind: str) -> Callable[[FaultOp], FaultOp]:
+    def deco(fn: FaultOp) -> FaultOp:
+        FAULT_OPS[kind] = fn
+        return fn
+    return deco
+
+def get_fault_op(kind: str) -> FaultOp:
+    op = FAULT_OPS.get(kind)
+    if op is None:
+        # módulos se registram no import; carrega sob demanda
+        try:
+            import_module(f"bop_twin.faults.{kind}")
+        except ImportError:
+            pass
+        op = FAULT_OPS.get(kind)
+        if op is None:
+            raise ValueError(f"Falha desconhecida: {kind}")
+    return op
 
 @dataclass
 class Fault:
     name: str
     def apply(self, cfg: Dict[str, Any]) -> Dict[str, Any]:
         """Retorna cfg modificado (cópia ou in-place)."""
-        return cfg
\ No newline at end of file
+        return cfg
+
+    def bind(self, cfg: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+        """
+        Resolve os caminhos no cfg uma vez e retorna uma função sem argumentos
+        que aplica a falha (in-place) nesse mesmo cfg.
+        """
+        return lambda: self.apply(cfg)
+
+FaultSpec = Union[Fault, Tuple[str, Dict[str, Any]]]
+
+def apply_faults(cfg: Dict[str, Any], faults: Iterable[FaultSpec]) -> Dict[str, Any]:
+    """
+    Aplica uma lista de falhas em sequência (in-place).
+    Cada item é um Fault ou um par (kind, params), ex.: ("leakage", {"CdA_leak_m2": 5e-9}).
+    """
+    for f in faults:
+        if isinstance(f, Fault):
+            cfg = f.apply(cfg)
+        else:
+            kind, params = f
+            cfg = get_fault_op(kind)(cfg, **params)
+    return cfg
+
+def apply_many(cfg: Dict[str, Any], faults: Iterable[Fault]) -> Dict[str, Any]:
+    """Liga todas as falhas ao cfg (uma resolução de caminho cada) e aplica em sequência."""
+    for run in [f.bind(cfg) for f in faults]:
+        run()
+    return cfg
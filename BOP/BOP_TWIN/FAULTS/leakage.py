@@ -1,13 +1,17 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Any
-from bop_twin.faults.faults_base import Fault
+from bop_twin.faults.faults_base import Fault, register_fault
+
+@register_fault("leakage")
+def apply_leakage(cfg: Dict[str, Any], CdA_leak_m2: float = 0.0) -> Dict[str, Any]:
+    cfg.setdefault("fault_runtime", {})
+    cfg["fault_runtime"]["CdA_leak_m2"] = float(CdA_leak_m2)
+    return cfg
 
 @dataclass
 class LeakageFault(Fault):
     CdA_leak_m2: float = 0.0
 
     def apply(self, cfg: Dict[str, Any]) -> Dict[str, Any]:
-        cfg.setdefault("fault_runtime", {})
-        cfg["fault_runtime"]["CdA_leak_m2"] = float(self.CdA_leak_m2)
-        return cfg
\ No newline at end of file
+        return apply_leakage(cfg, self.CdA_leak_m2)
\ No newline at end of file
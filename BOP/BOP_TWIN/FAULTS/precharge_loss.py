@@ -1,14 +1,28 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
-from bop_twin.faults.faults_base import Fault
+from typing import Dict, Any, Callable
+from bop_twin.faults.faults_base import Fault, register_fault
+
+@register_fault("precharge_loss")
+def apply_precharge_loss(cfg: Dict[str, Any], factor: float = 0.8) -> Dict[str, Any]:
+    for _, acc in cfg.get("accumulators", {}).items():
+        if acc.get("gas_precharge_psi") is not None:
+            acc["gas_precharge_psi"] = float(acc["gas_precharge_psi"]) * float(factor)
+    return cfg
 
 @dataclass
 class PrechargeLossFault(Fault):
     factor: float = 0.8
 
     def apply(self, cfg: Dict[str, Any]) -> Dict[str, Any]:
-        for _, acc in cfg.get("accumulators", {}).items():
-            if acc.get("gas_precharge_psi") is not None:
-                acc["gas_precharge_psi"] = float(acc["gas_precharge_psi"]) * float(self.factor)
-        return cfg
\ No newline at end of file
+        return apply_precharge_loss(cfg, self.factor)
+
+    def bind(self, cfg: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+        accs = [acc for acc in cfg.get("accumulators", {}).values() if acc.get("gas_precharge_psi") is not None]
+        factor = float(self.factor)
+
+        def run() -> Dict[str, Any]:
+            for acc in accs:
+                acc["gas_precharge_psi"] = float(acc["gas_precharge_psi"]) * factor
+            return cfg
+        return run
@@ -1,7 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
-from bop_twin.faults.faults_base import Fault
+from typing import Dict, Any, Callable
+from bop_twin.faults.faults_base import Fault, register_fault
+
+@register_fault("seal_friction_increase")
+def apply_seal_friction_increase(cfg: Dict[str, Any], actuator_name: str, delta_coulomb_n: float = 0.0) -> Dict[str, Any]:
+    a = cfg.get("actuators", {}).get(actuator_name)
+    if isinstance(a, dict):
+        a["friction_coulomb_n"] = float(a.get("friction_coulomb_n", 0.0)) + float(delta_coulomb_n)
+    return cfg
 
 @dataclass
 class SealFrictionIncreaseFault(Fault):
@@ -9,7 +16,15 @@ class SealFrictionIncreaseFault(Fault):
     delta_coulomb_n: float = 0.0
 
     def apply(self, cfg: Dict[str, Any]) -> Dict[str, Any]:
+        return apply_seal_friction_increase(cfg, self.actuator_name, self.delta_coulomb_n)
+
+    def bind(self, cfg: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
         a = cfg.get("actuators", {}).get(self.actuator_name)
-        if isinstance(a, dict):
-            a["friction_coulomb_n"] = float(a.get("friction_coulomb_n", 0.0)) + float(self.delta_coulomb_n)
-        return cfg
\ No newline at end of file
+        if not isinstance(a, dict):
+            return lambda: cfg
+        delta = float(self.delta_coulomb_n)
+
+        def run() -> Dict[str, Any]:
+            a["friction_coulomb_n"] = float(a.get("friction_coulomb_n", 0.0)) + delta
+            return cfg
+        return run
@@ -4,7 +4,15 @@ from pathlib import Path
 from typing import Dict, Any
 import numpy as np
 
-def export_csv(path: str | Path, t: np.ndarray, y: np.ndarray, headers: list[str]) -> None:
+_CSV_BLOCK_ROWS = 65536
+
+def export_csv(
+    path: str | Path, t: np.ndarray, y: np.ndarray, headers: list[str], fmt: str = "%.18e"
+) -> None:
+    """
+    fmt is the per-value %-format (default matches np.savetxt); a shorter one
+    such as "%.8g" gives smaller files and faster formatting.
+    """
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -12,4 +20,41 @@ def export_csv(path: str | Path, t: np.ndarray, y: np.ndarray, headers: list[str
     cols = ["t_s"] + headers
     header_line = ",".join(cols)
 
-    np.savetxt(path, data, delimiter=",", header=header_line, comments="")
\ No newline at end of file
+    # Same output as np.savetxt(fmt=fmt, delimiter=","), but each block of
+    # rows is formatted with a single %-operation. Text mode keeps savetxt's
+    # platform line endings; blocks bound the memory of the formatted text.
+    n_rows, n_cols = data.shape
+    row_fmt = ",".join([fmt] * n_cols) + "\n"
+    with open(path, "w", encoding="latin1") as fh:
+        fh.write(header_line + "\n")
+        for start in range(0, n_rows, _CSV_BLOCK_ROWS):
+            chunk = data[start:start + _CSV_BLOCK_ROWS]
+            fh.write((row_fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def export_npz(path: str | Path, t: np.ndarray, y: np.ndarray, headers: list[str], dtype: Any = np.float32) -> None:
+    """
+    Compressed binary alternative to export_csv: one array per column
+    (keys "t_s" + headers), stored as dtype (float32 by default).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    cols = {"t_s": np.asarray(t, dtype=dtype)}
+    for name, row in zip(headers, np.atleast_2d(y)):
+        cols[name] = np.asarray(row, dtype=dtype)
+    np.savez_compressed(path, **cols)
+
+
+def export_npy(path: str | Path, t: np.ndarray, y: np.ndarray, dtype: Any = np.float32) -> None:
+    """
+    Binary companion of export_csv: one (1 + n_states, n) array with rows
+    [t, y_0, y_1, ...], stored as dtype (float32 by default).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    data = np.empty((1 + len(np.atleast_2d(y)), len(t)), dtype=dtype)
+    data[0] = t
+    data[1:] = y
+    np.save(path, data)
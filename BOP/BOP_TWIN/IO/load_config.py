@@ -3,10 +3,15 @@ from __future__ import annotations
 import json
 import math
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, Iterator, Union
 
 from bop_twin.core.units import psi_to_pa, gal_to_m3, liter_to_m3, inch_to_m
 
+try:
+    import orjson as _orjson  # opcional: decoder nativo, bem mais rápido que o json da stdlib
+except ImportError:
+    _orjson = None
+
 class ConfigError(ValueError):
     pass
 
@@ -15,8 +20,11 @@ def _read_json(path: Union[str, Path]) -> Dict[str, Any]:
     if not p.exists():
         raise ConfigError(f"Arquivo não encontrado: {p}")
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as e:
+        if _orjson is not None:
+            data = _orjson.loads(p.read_bytes())
+        else:
+            data = json.loads(p.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError é subclasse
         raise ConfigError(f"JSON inválido em {p}: {e}") from e
     if not isinstance(data, dict):
         raise ConfigError("Topo do JSON deve ser um objeto.")
@@ -27,28 +35,76 @@ def _get(cfg: Dict[str, Any], key: str) -> Any:
         raise ConfigError(f"Campo obrigatório ausente: {key}")
     return cfg[key]
 
-def _ensure_minimum(cfg: Dict[str, Any]) -> None:
-    _get(cfg, "meta")
-    _get(cfg["meta"], "name")
-
-    _get(cfg, "fluid")
-    _get(cfg["fluid"], "rho")
-    _get(cfg["fluid"], "bulk_modulus")
+# seção -> campos obrigatórios dentro dela (verificados nessa ordem)
+_REQUIRED_FIELDS = (
+    ("meta", ("name",)),
+    ("fluid", ("rho", "bulk_modulus")),
+)
+# seções que devem ser dict com pelo menos 1 item
+_NON_EMPTY_SECTIONS = ("accumulators", "valves", "actuators")
 
-    _get(cfg, "accumulators")
-    if not isinstance(cfg["accumulators"], dict) or len(cfg["accumulators"]) == 0:
-        raise ConfigError("'accumulators' deve ser dict com pelo menos 1 item.")
+def _ensure_minimum(cfg: Dict[str, Any]) -> None:
+    for section, fields in _REQUIRED_FIELDS:
+        sub = _get(cfg, section)
+        for field in fields:
+            _get(sub, field)
+
+    for section in _NON_EMPTY_SECTIONS:
+        sub = _get(cfg, section)
+        if not isinstance(sub, dict) or len(sub) == 0:
+            raise ConfigError(f"'{section}' deve ser dict com pelo menos 1 item.")
+
+# (campo de origem, campo SI gerado, conversão)
+_RAM_SI_FIELDS = (
+    ("main_piston_diameter_in", "main_piston_diameter_m", inch_to_m),
+    ("rod_diameter_in", "rod_diameter_m", inch_to_m),
+    ("closing_volume_gal", "closing_volume_m3", gal_to_m3),
+    ("actuation_pressure_psi", "actuation_pressure_pa", psi_to_pa),
+    ("high_pressure_psi", "high_pressure_pa", psi_to_pa),
+)
+_ACC_SI_FIELDS = (
+    ("gas_precharge_psi", "gas_precharge_pa", psi_to_pa),
+    ("gas_volume_l", "gas_volume_m3", liter_to_m3),
+    ("fluid_volume_l", "fluid_volume_m3", liter_to_m3),
+)
+
+def _convert_fields(d: Dict[str, Any], table) -> None:
+    for src, dst, conv in table:
+        v = d.get(src)
+        if v is not None:
+            d[dst] = conv(float(v))
 
-    _get(cfg, "valves")
-    if not isinstance(cfg["valves"], dict) or len(cfg["valves"]) == 0:
-        raise ConfigError("'valves' deve ser dict com pelo menos 1 item.")
+def load_config(path: Union[str, Path], *, convert_to_SI: bool = False) -> Dict[str, Any]:
+    return _normalize_config(_read_json(path), convert_to_SI=convert_to_SI)
 
-    _get(cfg, "actuators")
-    if not isinstance(cfg["actuators"], dict) or len(cfg["actuators"]) == 0:
-        raise ConfigError("'actuators' deve ser dict com pelo menos 1 item.")
+def _loads(line: bytes) -> Any:
+    return _orjson.loads(line) if _orjson is not None else json.loads(line)
 
-def load_config(path: Union[str, Path], *, convert_to_SI: bool = False) -> Dict[str, Any]:
-    cfg = _read_json(path)
+def iter_configs(path: Union[str, Path], *, convert_to_SI: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Lê um arquivo NDJSON (um config de BOP por linha) sob demanda: cada linha é
+    decodificada, validada e normalizada como em load_config, sem carregar o
+    arquivo inteiro. Linhas em branco são ignoradas.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise ConfigError(f"Arquivo não encontrado: {p}")
+    with p.open("rb") as f:
+        for lineno, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                cfg = _loads(line)
+            except json.JSONDecodeError as e:  # orjson.JSONDecodeError é subclasse
+                raise ConfigError(f"JSON inválido em {p}:{lineno}: {e}") from e
+            if not isinstance(cfg, dict):
+                raise ConfigError(f"Linha {lineno} de {p} deve ser um objeto.")
+            try:
+                yield _normalize_config(cfg, convert_to_SI=convert_to_SI)
+            except ConfigError as e:
+                raise ConfigError(f"{p}:{lineno}: {e}") from e
+
+def _normalize_config(cfg: Dict[str, Any], *, convert_to_SI: bool) -> Dict[str, Any]:
     _ensure_minimum(cfg)
 
     # Normaliza números básicos
@@ -64,16 +120,7 @@ def load_config(path: Union[str, Path], *, convert_to_SI: bool = False) -> Dict[
         rams = cfg.get("rams", {})
         if isinstance(rams, dict):
             def convert_ram(ram: dict):
-                if ram.get("main_piston_diameter_in") is not None:
-                    ram["main_piston_diameter_m"] = inch_to_m(float(ram["main_piston_diameter_in"]))
-                if ram.get("rod_diameter_in") is not None:
-                    ram["rod_diameter_m"] = inch_to_m(float(ram["rod_diameter_in"]))
-                if ram.get("closing_volume_gal") is not None:
-                    ram["closing_volume_m3"] = gal_to_m3(float(ram["closing_volume_gal"]))
-                if ram.get("actuation_pressure_psi") is not None:
-                    ram["actuation_pressure_pa"] = psi_to_pa(float(ram["actuation_pressure_psi"]))
-                if ram.get("high_pressure_psi") is not None:
-                    ram["high_pressure_pa"] = psi_to_pa(float(ram["high_pressure_psi"]))
+                _convert_fields(ram, _RAM_SI_FIELDS)
                 if ram.get("main_piston_diameter_m") is not None:
                     d = ram["main_piston_diameter_m"]
                     ram["main_piston_area_m2"] = math.pi * d * d / 4.0
@@ -88,12 +135,7 @@ def load_config(path: Union[str, Path], *, convert_to_SI: bool = False) -> Dict[
                         convert_ram(pr)
 
         # Converte acumuladores/atuadores se você preencher esses campos no JSON
-        for _, acc in cfg.get("accumulators", {}).items():
-            if acc.get("gas_precharge_psi") is not None:
-                acc["gas_precharge_pa"] = psi_to_pa(float(acc["gas_precharge_psi"]))
-            if acc.get("gas_volume_l") is not None:
-                acc["gas_volume_m3"] = liter_to_m3(float(acc["gas_volume_l"]))
-            if acc.get("fluid_volume_l") is not None:
-                acc["fluid_volume_m3"] = liter_to_m3(float(acc["fluid_volume_l"]))
+        for acc in cfg.get("accumulators", {}).values():
+            _convert_fields(acc, _ACC_SI_FIELDS)
 
     return cfg
\ No newline at end of file
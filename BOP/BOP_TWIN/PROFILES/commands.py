@@ -1,11 +1,25 @@
 from __future__ import annotations
 
-def step_opening(t_step: float = 0.0, level: float = 1.0):
-    def f(t: float) -> float:
-        return float(level) if t >= float(t_step) else 0.0
-    return f
-
-def pulse_opening(t_on: float, t_off: float, level: float = 1.0):
-    def f(t: float) -> float:
-        return float(level) if (t >= t_on and t < t_off) else 0.0
-    return f
\ No newline at end of file
+from dataclasses import dataclass
+import math
+
+
+@dataclass(frozen=True, slots=True)
+class OpeningProfile:
+    """
+    Rectangular opening command: level on [t_on, t_off), 0 elsewhere.
+    Plain data (hashable/picklable); calling it evaluates the command at t.
+    """
+    t_on: float
+    t_off: float = math.inf
+    level: float = 1.0
+
+    def __call__(self, t: float) -> float:
+        return self.level if self.t_on <= t < self.t_off else 0.0
+
+
+def step_opening(t_step: float = 0.0, level: float = 1.0) -> OpeningProfile:
+    return OpeningProfile(float(t_step), math.inf, float(level))
+
+def pulse_opening(t_on: float, t_off: float, level: float = 1.0) -> OpeningProfile:
+    return OpeningProfile(float(t_on), float(t_off), float(level))
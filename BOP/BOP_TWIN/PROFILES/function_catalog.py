@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Literal
+from typing import Dict, Literal, Sequence
+import numpy as np
 
 Supply = Literal["HP", "LP"]
 
@@ -72,4 +73,50 @@ def get_default_function_catalog() -> Dict[str, FunctionSpec]:
         "LIK": FunctionSpec("LIK", supply="LP", V_act_m3=V_small, valve_area_m2=A_small),
         "LOK": FunctionSpec("LOK", supply="LP", V_act_m3=V_small, valve_area_m2=A_small),
     }
-    return cat
\ No newline at end of file
+    return cat
+
+
+@dataclass(frozen=True)
+class FunctionCatalog:
+    """
+    Catálogo em forma de arrays paralelos (um índice por função), para filtrar
+    e ler parâmetros de todas as funções de uma vez.
+    """
+    names: np.ndarray        # str
+    supply: np.ndarray       # str ("HP"/"LP")
+    V_act_m3: np.ndarray     # float64
+    valve_area_m2: np.ndarray  # float64
+
+    @classmethod
+    def from_specs(cls, specs: Dict[str, FunctionSpec]) -> "FunctionCatalog":
+        items = list(specs.values())
+        return cls(
+            names=np.array([s.name for s in items], dtype=str),
+            supply=np.array([s.supply for s in items], dtype=str),
+            V_act_m3=np.array([s.V_act_m3 for s in items], dtype=np.float64),
+            valve_area_m2=np.array([s.valve_area_m2 for s in items], dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def select(self, idx: Sequence[int] | np.ndarray | slice) -> "FunctionCatalog":
+        return FunctionCatalog(
+            names=self.names[idx],
+            supply=self.supply[idx],
+            V_act_m3=self.V_act_m3[idx],
+            valve_area_m2=self.valve_area_m2[idx],
+        )
+
+    def as_dict(self) -> Dict[str, FunctionSpec]:
+        return {
+            str(n): FunctionSpec(str(n), supply=str(s), V_act_m3=float(v), valve_area_m2=float(a))
+            for n, s, v, a in zip(self.names, self.supply, self.V_act_m3, self.valve_area_m2)
+        }
+
+
+def get_default_function_catalog_arrays() -> FunctionCatalog:
+    """
+    Mesmo catálogo de get_default_function_catalog, em forma de arrays (FunctionCatalog).
+    """
+    return FunctionCatalog.from_specs(get_default_function_catalog())
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from typing import Sequence
+import math
 import numpy as np
 
-from bop_twin.components.valve import OrificeValve, OrificeValveParams
+from bop_twin.components.valve import OrificeValve, OrificeValveParams, ValveBank
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LumpedHydraulicParams:
     rho: float
     bulk_modulus: float
@@ -21,38 +23,120 @@ class LumpedHydraulicParams:
     act_structure_compliance_m3_per_pa: float = 0.0
     line_resistance_pa_s_per_m3: float = 0.0
 
+    def __post_init__(self):
+        # coerce once at construction so consumers can trust plain Python floats
+        for f in fields(self):
+            object.__setattr__(self, f.name, float(getattr(self, f.name)))
+
+
+def _leak_coeff(CdA_leak_m2: float, rho: float) -> float:
+    # Q_leak = k * sqrt(dP) with k = CdA * sqrt(2 / rho); loop invariant per system
+    if CdA_leak_m2 <= 0.0:
+        return 0.0
+    return CdA_leak_m2 * math.sqrt(2.0 / rho)
+
+
+def _leak_flow(p_act_pa: float, p_atm_pa: float, k_leak: float) -> float:
+    # Orifice leak from the actuator node to atmosphere (scalar, per RHS call)
+    dP = p_act_pa - p_atm_pa
+    if k_leak <= 0.0 or dP <= 0.0:
+        return 0.0
+    return k_leak * math.sqrt(dP)
+
+
+def _leak_dflow_dp(p_act_pa: float, p_atm_pa: float, CdA_leak_m2: float, rho: float, dP_eps: float = 1e4) -> float:
+    if CdA_leak_m2 <= 0.0:
+        return 0.0
+    dP = p_act_pa - p_atm_pa
+    if dP <= 0.0:
+        return 0.0
+    return CdA_leak_m2 / math.sqrt(2.0 * rho * max(dP, dP_eps))
+
+
+def _effective_bulk_modulus(p_node_pa: float, beta_liq: float, phi: float, liq_compliance: float) -> float:
+    # beta_liq already floored at 1e3, phi already clipped to [0, 0.95],
+    # liq_compliance = (1 - phi) / beta_liq precomputed by the caller
+    if phi <= 0.0:
+        return beta_liq
+    p_abs = max(p_node_pa, 1e4)
+    inv_beta_eff = liq_compliance + (phi / p_abs)
+    return 1.0 / max(inv_beta_eff, 1e-18)
+
+
+def _node_capacitance(
+    node_volume_m3: float,
+    p_node_pa: float,
+    structural_compliance_m3_per_pa: float,
+    beta_liq: float,
+    phi: float,
+    liq_compliance: float,
+) -> float:
+    # Plain-float kernel shared by rhs/jac: no method dispatch per node
+    beta_eff = _effective_bulk_modulus(p_node_pa, beta_liq, phi, liq_compliance)
+    fluid_cap = max(node_volume_m3, 1e-9) / max(beta_eff, 1e3)
+    struct_cap = max(structural_compliance_m3_per_pa, 0.0)
+    return max(fluid_cap + struct_cap, 1e-15)
+
+
+
+def _node_capacitance_dp(
+    node_volume_m3: float,
+    p_node_pa: float,
+    structural_compliance_m3_per_pa: float,
+    beta_liq: float,
+    phi: float,
+    liq_compliance: float,
+) -> float:
+    # dC/dp of _node_capacitance: only the free-gas term phi/p depends on pressure
+    if phi <= 0.0 or p_node_pa <= 1e4:
+        return 0.0
+    inv_beta_eff = liq_compliance + (phi / p_node_pa)
+    if inv_beta_eff <= 1e-18 or inv_beta_eff > 1e-3:
+        return 0.0  # beta_eff clamps (1e-18 floor, 1e3 Pa floor) are flat in p
+    V = max(node_volume_m3, 1e-9)
+    if V * inv_beta_eff + max(structural_compliance_m3_per_pa, 0.0) <= 1e-15:
+        return 0.0
+    return -V * phi / (p_node_pa * p_node_pa)
 
 class BOPHydraulicMVP:
     """
     States: y=[P_acc, P_act] in Pa.
     """
 
+    __slots__ = (
+        "hp", "valve", "opening_fun", "_k_leak", "_closed_at_zero_opening",
+        "_rho", "_p_atm", "_V_acc_total", "_V_act_total", "_struct_acc", "_struct_act",
+        "_beta_liq", "_phi", "_liq_compliance", "_r_line",
+    )
+
     def __init__(self, hp: LumpedHydraulicParams, valve: OrificeValve, opening_fun=None):
         self.hp = hp
         self.valve = valve
         self.opening_fun = opening_fun or (lambda t: 1.0)
+        self._k_leak = _leak_coeff(hp.CdA_leak_m2, hp.rho)
+        # hp is frozen (and float-coerced): parameter-only terms of rhs/jac are evaluated once here
+        self._rho = hp.rho
+        self._p_atm = hp.p_atm_pa
+        self._V_acc_total = hp.V_acc_eff_m3 + hp.V_acc_line_m3
+        self._V_act_total = hp.V_act_m3 + hp.V_act_line_m3
+        self._struct_acc = hp.acc_structure_compliance_m3_per_pa
+        self._struct_act = hp.act_structure_compliance_m3_per_pa
+        self._beta_liq = max(hp.bulk_modulus, 1e3)
+        self._phi = min(max(hp.gas_volume_fraction, 0.0), 0.95)
+        self._liq_compliance = (1.0 - self._phi) / self._beta_liq
+        self._r_line = hp.line_resistance_pa_s_per_m3
+        # opening is clipped to min_opening inside the valve, so 0 only means closed if min_opening <= 0
+        self._closed_at_zero_opening = float(valve.p.min_opening) <= 0.0
 
     def leak_flow_m3s(self, p_act_pa: float) -> float:
-        if self.hp.CdA_leak_m2 <= 0:
-            return 0.0
-        dP = max(float(p_act_pa) - self.hp.p_atm_pa, 0.0)
-        if dP <= 0:
-            return 0.0
-        return self.hp.CdA_leak_m2 * np.sqrt(2.0 * dP / self.hp.rho)
+        return _leak_flow(float(p_act_pa), self._p_atm, self._k_leak)
 
     def effective_bulk_modulus_pa(self, p_node_pa: float) -> float:
         """
         Effective bulk modulus including optional free-gas fraction
         (Wood's equation style mixture approximation).
         """
-        beta_liq = max(float(self.hp.bulk_modulus), 1e3)
-        phi = float(np.clip(self.hp.gas_volume_fraction, 0.0, 0.95))
-        if phi <= 0.0:
-            return beta_liq
-
-        p_abs = max(float(p_node_pa), 1e4)
-        inv_beta_eff = ((1.0 - phi) / beta_liq) + (phi / p_abs)
-        return 1.0 / max(inv_beta_eff, 1e-18)
+        return _effective_bulk_modulus(float(p_node_pa), self._beta_liq, self._phi, self._liq_compliance)
 
     def node_capacitance_m3_per_pa(
         self,
@@ -60,79 +144,246 @@ class BOPHydraulicMVP:
         p_node_pa: float,
         structural_compliance_m3_per_pa: float,
     ) -> float:
-        beta_eff = self.effective_bulk_modulus_pa(p_node_pa)
-        fluid_cap = max(float(node_volume_m3), 1e-9) / max(beta_eff, 1e3)
-        struct_cap = max(float(structural_compliance_m3_per_pa), 0.0)
-        return max(fluid_cap + struct_cap, 1e-15)
+        return _node_capacitance(
+            float(node_volume_m3), float(p_node_pa), float(structural_compliance_m3_per_pa),
+            self._beta_liq, self._phi, self._liq_compliance,
+        )
 
     def apply_line_resistance_limit(self, q_m3s: float, dP_pa: float) -> float:
-        r_line = float(self.hp.line_resistance_pa_s_per_m3)
+        r_line = self._r_line
         if r_line <= 0.0:
-            return float(q_m3s)
-        q_limit = abs(float(dP_pa)) / r_line
-        return float(np.sign(q_m3s) * min(abs(float(q_m3s)), q_limit))
+            return q_m3s
+        if q_m3s == 0.0:
+            return 0.0
+        q_limit = abs(dP_pa) / r_line
+        return math.copysign(min(abs(q_m3s), q_limit), q_m3s)
 
     def rhs(self, t: float, y):
-        P_acc = float(y[0])
-        P_act = float(y[1])
+        # solver state is already float64; tolist() yields Python floats in one call
+        P_acc, P_act = np.asarray(y, dtype=float).tolist()
+
+        opening = float(self.opening_fun(t))
+        if opening <= 0.0 and self._closed_at_zero_opening:
+            # fully closed valve: no flow, skip the orifice and line-limit math
+            Q = 0.0
+        else:
+            Q = self.valve.flow_m3s(P_acc, P_act, rho=self._rho, opening=opening)
+            Q = self.apply_line_resistance_limit(Q, P_acc - P_act)
+        Q_leak = _leak_flow(P_act, self._p_atm, self._k_leak)
+
+        C_acc = _node_capacitance(self._V_acc_total, P_acc, self._struct_acc, self._beta_liq, self._phi, self._liq_compliance)
+        C_act = _node_capacitance(self._V_act_total, P_act, self._struct_act, self._beta_liq, self._phi, self._liq_compliance)
+
+        dPacc_dt = (-Q) / C_acc
+        dPact_dt = (Q - Q_leak) / C_act
+        return np.array((dPacc_dt, dPact_dt))
+
+    def jac(self, t: float, y) -> np.ndarray:
+        """
+        Analytic Jacobian d(rhs)/dy for implicit solvers (BDF/Radau/LSODA).
+        Includes the pressure dependence of the node capacitances (free gas).
+        """
+        P_acc, P_act = np.asarray(y, dtype=float).tolist()
 
         opening = float(self.opening_fun(t))
         dP_acc_to_act = P_acc - P_act
-        Q = self.valve.flow_m3s(P_acc, P_act, rho=self.hp.rho, opening=opening)
-        Q = self.apply_line_resistance_limit(Q, dP_acc_to_act)
-        Q_leak = self.leak_flow_m3s(P_act)
+        g = self.valve.dflow_ddp(P_acc, P_act, rho=self._rho, opening=opening)
+
+        r_line = self._r_line
+        if r_line > 0.0 and g > 0.0:
+            Q = self.valve.flow_m3s(P_acc, P_act, rho=self._rho, opening=opening)
+            if abs(dP_acc_to_act) / r_line < abs(Q):
+                # resistance-limited branch: Q = sign(Q) * |dP| / r_line
+                g = (1.0 if Q * dP_acc_to_act > 0.0 else -1.0) / r_line
+
+        dQ_leak = _leak_dflow_dp(P_act, self._p_atm, self.hp.CdA_leak_m2, self._rho)
 
-        V_acc_total = float(self.hp.V_acc_eff_m3) + float(self.hp.V_acc_line_m3)
-        V_act_total = float(self.hp.V_act_m3) + float(self.hp.V_act_line_m3)
+        C_acc = _node_capacitance(self._V_acc_total, P_acc, self._struct_acc, self._beta_liq, self._phi, self._liq_compliance)
+        C_act = _node_capacitance(self._V_act_total, P_act, self._struct_act, self._beta_liq, self._phi, self._liq_compliance)
 
-        C_acc = self.node_capacitance_m3_per_pa(
-            node_volume_m3=V_acc_total,
-            p_node_pa=P_acc,
-            structural_compliance_m3_per_pa=float(self.hp.acc_structure_compliance_m3_per_pa),
+        J = np.array([
+            [-g / C_acc, g / C_acc],
+            [g / C_act, (-g - dQ_leak) / C_act],
+        ])
+
+        if self._phi > 0.0:
+            # d(X/C)/dp = X'/C - X*C'/C^2 on the diagonal
+            dC_acc = _node_capacitance_dp(self._V_acc_total, P_acc, self._struct_acc, self._beta_liq, self._phi, self._liq_compliance)
+            dC_act = _node_capacitance_dp(self._V_act_total, P_act, self._struct_act, self._beta_liq, self._phi, self._liq_compliance)
+            dy = self.rhs(t, (P_acc, P_act))
+            J[0, 0] -= dy[0] * dC_acc / C_acc
+            J[1, 1] -= dy[1] * dC_act / C_act
+
+        return J
+
+
+
+class BOPHydraulicBatch:
+    """
+    N independent BOPHydraulicMVP systems stacked into one ODE, so a single
+    solver run advances all of them.
+    States: y=[P_acc_0, P_act_0, P_acc_1, P_act_1, ...] in Pa.
+    All systems share one opening profile and one fluid density.
+    """
+
+    def __init__(self, systems: Sequence[BOPHydraulicMVP], opening_fun=None):
+        if len(systems) == 0:
+            raise ValueError("BOPHydraulicBatch needs at least one system")
+        hps = [s.hp for s in systems]
+        rho = hps[0].rho
+        if any(hp.rho != rho for hp in hps):
+            raise ValueError("BOPHydraulicBatch requires the same fluid density for all systems")
+
+        self.systems = tuple(systems)
+        self.rho = rho
+        self.opening_fun = opening_fun or systems[0].opening_fun
+        self.valves = ValveBank([s.valve.p for s in systems], rho)
+
+        self._V_acc = np.array([s._V_acc_total for s in systems], dtype=float)
+        self._V_act = np.array([s._V_act_total for s in systems], dtype=float)
+        self._struct_acc = np.array([s._struct_acc for s in systems], dtype=float)
+        self._struct_act = np.array([s._struct_act for s in systems], dtype=float)
+        self._beta_liq = np.array([s._beta_liq for s in systems], dtype=float)
+        self._phi = np.array([s._phi for s in systems], dtype=float)
+        self._liq_compliance = np.array([s._liq_compliance for s in systems], dtype=float)
+        self._p_atm = np.array([s._p_atm for s in systems], dtype=float)
+        self._CdA_leak = np.array([hp.CdA_leak_m2 for hp in hps], dtype=float)
+        self._k_leak = np.array([s._k_leak for s in systems], dtype=float)
+        self._r_line = np.array([s._r_line for s in systems], dtype=float)
+        self._has_gas = bool(np.any(self._phi > 0.0))
+        self._has_line = bool(np.any(self._r_line > 0.0))
+
+    def __len__(self) -> int:
+        return len(self.systems)
+
+    def stack_states(self, y0s) -> np.ndarray:
+        # per-system [P_acc, P_act] pairs -> interleaved state vector
+        return np.asarray(y0s, dtype=float).reshape(len(self.systems), 2).ravel()
+
+    def split_states(self, y: np.ndarray) -> list[np.ndarray]:
+        # (2N, n_t) solver output -> N arrays of shape (2, n_t)
+        y = np.asarray(y)
+        return [y[2 * i:2 * i + 2] for i in range(len(self.systems))]
+
+    def _capacitance(self, V: np.ndarray, p: np.ndarray, struct: np.ndarray) -> np.ndarray:
+        # element-wise _node_capacitance
+        if self._has_gas:
+            inv_beta = self._liq_compliance + self._phi / np.maximum(p, 1e4)
+            beta_eff = np.where(self._phi > 0.0, 1.0 / np.maximum(inv_beta, 1e-18), self._beta_liq)
+        else:
+            beta_eff = self._beta_liq
+        fluid_cap = np.maximum(V, 1e-9) / np.maximum(beta_eff, 1e3)
+        return np.maximum(fluid_cap + np.maximum(struct, 0.0), 1e-15)
+
+    def _capacitance_dp(self, V: np.ndarray, p: np.ndarray, struct: np.ndarray) -> np.ndarray:
+        # element-wise _node_capacitance_dp
+        p_safe = np.maximum(p, 1e4)
+        inv_beta = self._liq_compliance + self._phi / p_safe
+        Vc = np.maximum(V, 1e-9)
+        active = (
+            (self._phi > 0.0) & (p > 1e4) & (inv_beta > 1e-18) & (inv_beta <= 1e-3)
+            & (Vc * inv_beta + np.maximum(struct, 0.0) > 1e-15)
         )
-        C_act = self.node_capacitance_m3_per_pa(
-            node_volume_m3=V_act_total,
-            p_node_pa=P_act,
-            structural_compliance_m3_per_pa=float(self.hp.act_structure_compliance_m3_per_pa),
+        return np.where(active, -Vc * self._phi / (p_safe * p_safe), 0.0)
+
+    def _valve_flow(self, P_acc: np.ndarray, P_act: np.ndarray, opening: float) -> np.ndarray:
+        Q = self.valves.flow_m3s(P_acc, P_act, opening=opening)
+        if self._has_line:
+            # element-wise apply_line_resistance_limit
+            with np.errstate(divide="ignore", invalid="ignore"):
+                q_limit = np.abs(P_acc - P_act) / self._r_line
+            Q = np.where(self._r_line > 0.0, np.sign(Q) * np.minimum(np.abs(Q), q_limit), Q)
+        return Q
+
+    def rhs(self, t: float, y) -> np.ndarray:
+        Y = np.asarray(y, dtype=float).reshape(-1, 2)
+        P_acc = Y[:, 0]
+        P_act = Y[:, 1]
+
+        Q = self._valve_flow(P_acc, P_act, float(self.opening_fun(t)))
+        Q_leak = self._k_leak * np.sqrt(np.maximum(P_act - self._p_atm, 0.0))
+
+        C_acc = self._capacitance(self._V_acc, P_acc, self._struct_acc)
+        C_act = self._capacitance(self._V_act, P_act, self._struct_act)
+
+        dy = np.empty_like(Y)
+        dy[:, 0] = -Q / C_acc
+        dy[:, 1] = (Q - Q_leak) / C_act
+        return dy.ravel()
+
+    def jac(self, t: float, y) -> np.ndarray:
+        """
+        Block-diagonal analytic Jacobian (one 2x2 block per system), same
+        terms as BOPHydraulicMVP.jac.
+        """
+        Y = np.asarray(y, dtype=float).reshape(-1, 2)
+        P_acc = Y[:, 0]
+        P_act = Y[:, 1]
+
+        opening = float(self.opening_fun(t))
+        g = self.valves.dflow_ddp(P_acc, P_act, opening=opening)
+        if self._has_line:
+            dP = P_acc - P_act
+            Q = self.valves.flow_m3s(P_acc, P_act, opening=opening)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                limited = (self._r_line > 0.0) & (g > 0.0) & (np.abs(dP) / self._r_line < np.abs(Q))
+                g = np.where(limited, np.where(Q * dP > 0.0, 1.0, -1.0) / self._r_line, g)
+
+        dP_leak = P_act - self._p_atm
+        dQ_leak = np.where(
+            (self._CdA_leak > 0.0) & (dP_leak > 0.0),
+            self._CdA_leak / np.sqrt(2.0 * self.rho * np.maximum(dP_leak, 1e4)),
+            0.0,
         )
 
-        dPacc_dt = (-Q) / C_acc
-        dPact_dt = (Q - Q_leak) / C_act
-        return [dPacc_dt, dPact_dt]
+        C_acc = self._capacitance(self._V_acc, P_acc, self._struct_acc)
+        C_act = self._capacitance(self._V_act, P_act, self._struct_act)
 
+        d_acc = -g / C_acc
+        d_act = (-g - dQ_leak) / C_act
+        if self._has_gas:
+            dy = self.rhs(t, y).reshape(-1, 2)
+            d_acc = d_acc - dy[:, 0] * self._capacitance_dp(self._V_acc, P_acc, self._struct_acc) / C_acc
+            d_act = d_act - dy[:, 1] * self._capacitance_dp(self._V_act, P_act, self._struct_act) / C_act
+
+        n = 2 * len(Y)
+        J = np.zeros((n, n))
+        i_acc = np.arange(0, n, 2)
+        i_act = i_acc + 1
+        J[i_acc, i_acc] = d_acc
+        J[i_acc, i_act] = g / C_acc
+        J[i_act, i_acc] = g / C_act
+        J[i_act, i_act] = d_act
+        return J
 
-def build_system_from_cfg(cfg: dict, *, opening_fun=None, leak_CdA_m2: float = 0.0) -> BOPHydraulicMVP:
-    rho = float(cfg["fluid"]["rho"])
-    beta = float(cfg["fluid"]["bulk_modulus"])
 
+def build_system_from_cfg(cfg: dict, *, opening_fun=None, leak_CdA_m2: float = 0.0) -> BOPHydraulicMVP:
+    fluid = cfg["fluid"]
     hyd = cfg.get("hydraulics", {})
-    V_acc_eff = float(hyd.get("V_acc_eff_m3", 0.02))  # default 20 L
-    V_act = float(hyd.get("V_act_m3", 0.005))  # default 5 L
-    gas_fraction = float(cfg.get("fluid", {}).get("gas_volume_fraction", 0.0))
 
+    # LumpedHydraulicParams coerces its fields to float on construction
     hp = LumpedHydraulicParams(
-        rho=rho,
-        bulk_modulus=beta,
-        V_acc_eff_m3=V_acc_eff,
-        V_act_m3=V_act,
-        CdA_leak_m2=float(leak_CdA_m2),
-        gas_volume_fraction=gas_fraction,
-        V_acc_line_m3=float(hyd.get("V_acc_line_m3", 0.0)),
-        V_act_line_m3=float(hyd.get("V_act_line_m3", 0.0)),
-        acc_structure_compliance_m3_per_pa=float(hyd.get("acc_structure_compliance_m3_per_pa", 0.0)),
-        act_structure_compliance_m3_per_pa=float(hyd.get("act_structure_compliance_m3_per_pa", 0.0)),
-        line_resistance_pa_s_per_m3=float(hyd.get("line_resistance_pa_s_per_m3", 0.0)),
+        rho=fluid["rho"],
+        bulk_modulus=fluid["bulk_modulus"],
+        V_acc_eff_m3=hyd.get("V_acc_eff_m3", 0.02),  # default 20 L
+        V_act_m3=hyd.get("V_act_m3", 0.005),  # default 5 L
+        CdA_leak_m2=leak_CdA_m2,
+        gas_volume_fraction=fluid.get("gas_volume_fraction", 0.0),
+        V_acc_line_m3=hyd.get("V_acc_line_m3", 0.0),
+        V_act_line_m3=hyd.get("V_act_line_m3", 0.0),
+        acc_structure_compliance_m3_per_pa=hyd.get("acc_structure_compliance_m3_per_pa", 0.0),
+        act_structure_compliance_m3_per_pa=hyd.get("act_structure_compliance_m3_per_pa", 0.0),
+        line_resistance_pa_s_per_m3=hyd.get("line_resistance_pa_s_per_m3", 0.0),
     )
 
-    first_valve_name = next(iter(cfg["valves"].keys()))
-    vcfg = cfg["valves"][first_valve_name]
+    first_valve_name, vcfg = next(iter(cfg["valves"].items()))
     valve = OrificeValve(
         OrificeValveParams(
             name=first_valve_name,
             cd=float(vcfg.get("cd", 0.62)),
             area_m2=float(vcfg.get("area_m2", 1e-4)),
             min_delta_p_pa=float(vcfg.get("min_delta_p_pa", 0.0)),
-            yield_stress_pa=float(vcfg.get("yield_stress_pa", cfg.get("fluid", {}).get("yield_stress_pa", 0.0))),
+            yield_stress_pa=float(vcfg.get("yield_stress_pa", fluid.get("yield_stress_pa", 0.0))),
             hydraulic_diameter_m=float(vcfg.get("hydraulic_diameter_m", 0.01)),
             equivalent_length_m=float(vcfg.get("equivalent_length_m", 1.0)),
             transmission_gain=float(vcfg.get("transmission_gain", 1.0)),
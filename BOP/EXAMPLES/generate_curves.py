@@ -2,16 +2,20 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+import os
 from pathlib import Path
 import numpy as np
 
 from bop_twin.io.load_config import load_config
 from bop_twin.core.ode import integrate_ode
 from bop_twin.core.units import psi_to_pa
-from bop_twin.io.export import export_csv
-from bop_twin.profiles.function_catalog import get_default_function_catalog
+from bop_twin.io.export import export_csv, export_npy, export_npz
+from bop_twin.profiles.commands import OpeningProfile, step_opening
+from bop_twin.profiles.function_catalog import get_default_function_catalog_arrays
 from bop_twin.components.valve import OrificeValve, OrificeValveParams
-from bop_twin.systems.bop_hydraulic import BOPHydraulicMVP, LumpedHydraulicParams
+from bop_twin.systems.bop_hydraulic import BOPHydraulicBatch, BOPHydraulicMVP, LumpedHydraulicParams
 
 
 def parse_args():
@@ -44,6 +48,34 @@ def parse_args():
     parser.add_argument("--ode-method", type=str, default="BDF", help="ODE method (e.g., RK45, BDF, LSODA).")
     parser.add_argument("--rtol", type=float, default=1e-4, help="Relative tolerance for ODE solver.")
     parser.add_argument("--atol", type=float, default=1e-7, help="Absolute tolerance for ODE solver.")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "npz"],
+        default="csv",
+        help="Output format: text CSV or compressed float32 .npz.",
+    )
+    parser.add_argument(
+        "--csv-fmt",
+        type=str,
+        default="%.8g",
+        help="Per-value format for CSV output (e.g. %%.8g, %%.18e).",
+    )
+    parser.add_argument(
+        "--npy",
+        action="store_true",
+        help="With CSV output, also write a float32 .npy companion ([t, P_acc, P_act] rows).",
+    )
+    parser.add_argument(
+        "--batched",
+        action="store_true",
+        help="Stack all functions/directions into one ODE per phase (press, hold, bleed).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for the simulations (1 = serial, <=0 = all cores).",
+    )
     return parser.parse_args()
 
 
@@ -59,176 +91,310 @@ def get_supply_pressures_pa(cfg: dict) -> dict:
     }
 
 
+def system_constants(cfg: dict) -> dict:
+    """
+    cfg-derived inputs of build_mvp_for_function, read and coerced once per run.
+    """
+    vcfg = cfg.get("valves", {}).get("directional_main", {})
+    return {
+        "rho": float(cfg["fluid"]["rho"]),
+        "beta": float(cfg["fluid"]["bulk_modulus"]),
+        "V_acc_eff": float(cfg.get("hydraulics", {}).get("V_acc_eff_m3", 0.02)),
+        "cd": float(vcfg.get("cd", 0.62)),
+        "allow_reverse_flow": bool(vcfg.get("allow_reverse_flow", True)),
+        "reverse_flow_gain": float(vcfg.get("reverse_flow_gain", 1.0)),
+    }
+
+
+@lru_cache(maxsize=None)
 def build_mvp_for_function(
-    cfg: dict,
+    rho: float,
+    beta: float,
+    V_acc_eff: float,
     *,
     V_act_m3: float,
     valve_area_m2: float,
     opening_fun,
     CdA_leak_m2: float = 0.0,
+    cd: float = 0.62,
+    allow_reverse_flow: bool = True,
+    reverse_flow_gain: float = 1.0,
 ):
-    rho = float(cfg["fluid"]["rho"])
-    beta = float(cfg["fluid"]["bulk_modulus"])
-    V_acc_eff = float(cfg.get("hydraulics", {}).get("V_acc_eff_m3", 0.02))
-
+    # systems are stateless, so identical parameter tuples can share one instance
     hp = LumpedHydraulicParams(
         rho=rho,
         bulk_modulus=beta,
         V_acc_eff_m3=V_acc_eff,
-        V_act_m3=float(V_act_m3),
-        CdA_leak_m2=float(CdA_leak_m2),
+        V_act_m3=V_act_m3,
+        CdA_leak_m2=CdA_leak_m2,
     )
 
-    vcfg = cfg.get("valves", {}).get("directional_main", {})
     valve = OrificeValve(
         OrificeValveParams(
             name="directional_equivalent",
-            cd=float(vcfg.get("cd", 0.62)),
+            cd=cd,
             area_m2=float(valve_area_m2),
-            allow_reverse_flow=bool(vcfg.get("allow_reverse_flow", True)),
-            reverse_flow_gain=float(vcfg.get("reverse_flow_gain", 1.0)),
+            allow_reverse_flow=allow_reverse_flow,
+            reverse_flow_gain=reverse_flow_gain,
         )
     )
 
     return BOPHydraulicMVP(hp, valve, opening_fun=opening_fun)
 
 
-def main():
-    args = parse_args()
-    cfg = load_config("configs/ns47.json", convert_to_SI=False)
-    supplies = get_supply_pressures_pa(cfg)
-    cat = get_default_function_catalog()
+_OPEN_STEP_1S = step_opening(t_step=1.0, level=1.0)
+_OPEN_CLOSED = OpeningProfile(0.0, 0.0, 0.0)
 
-    if args.functions:
-        allowed = {str(x).upper() for x in args.functions}
-        cat = {k: v for k, v in cat.items() if k.upper() in allowed}
-    if args.max_functions > 0:
-        cat = dict(list(cat.items())[: int(args.max_functions)])
 
-    out_dir = Path("out/generated")
-    out_dir.mkdir(parents=True, exist_ok=True)
+SCENARIOS = [
+    ("healthy", 0.0),
+    ("leak_small", 5e-9),
+    ("leak_big", 5e-8),
+]
+
+BLEED_SCENARIOS = [
+    ("bleed", 2e-7),
+]
+
 
-    def opening_step(t, t_step=1.0):
-        return 1.0 if t >= t_step else 0.0
+def _uniform_grid(t_end: float, dt: float) -> np.ndarray:
+    # linspace hits 0 and t_end exactly (no arange drift); read-only since it is shared
+    t = np.linspace(0.0, t_end, int(round(t_end / dt)) + 1, dtype=np.float64)
+    t.setflags(write=False)
+    return t
 
+
+def _time_grids(args):
+    # output grids depend only on the CLI durations/steps: build once, share across runs
+    t_eval_press = _uniform_grid(float(args.t_press), float(args.dt_fast))
+    t_eval_hold = _uniform_grid(float(args.t_hold), float(args.dt_hold))
+    t_eval_bleed = _uniform_grid(float(args.t_bleed), float(args.dt_bleed))
+    return t_eval_press, t_eval_hold, t_eval_bleed
+
+
+def _run_one(
+    consts: dict,
+    fname: str,
+    V_act_m3: float,
+    valve_area_m2: float,
+    direction_name: str,
+    p_acc0: float,
+    p_act0: float,
+    P_supply: float,
+    grids,
+    args,
+):
+    """
+    Runs every press/hold/bleed simulation of one (function, direction) pair.
+    Systems are built here so the call is self-contained for a worker process.
+    Returns a list of (file_name, t, y); CSVs are written by the caller.
+    """
     t_press = float(args.t_press)
     t_hold = float(args.t_hold)
     t_bleed = float(args.t_bleed)
+    t_eval_press, t_eval_hold, t_eval_bleed = grids
+
+    # the press phase has no leak: one run serves every scenario
+    sys_press = build_mvp_for_function(
+        **consts,
+        V_act_m3=V_act_m3,
+        valve_area_m2=valve_area_m2,
+        opening_fun=_OPEN_STEP_1S,
+        CdA_leak_m2=0.0,
+    )
+    sol_press = integrate_ode(
+        fun=sys_press.rhs,
+        y0=[p_acc0, p_act0],
+        t_span=(0.0, t_press),
+        t_eval=t_eval_press,
+        method=args.ode_method,
+        rtol=args.rtol,
+        atol=args.atol,
+        verbose=False,
+        # analytic jac pays off on the opening transient (and in the holds);
+        # the bleed runs decay towards atmospheric, where the capped leak slope
+        # makes BDF refactor more often, so they keep finite differences
+        jac=sys_press.jac if args.ode_method in _IMPLICIT_METHODS else None,
+        t_eval_is_sanitized=True,
+    )
+
+    # hold scenarios differ only in leak area: advance them as one stacked ODE
+    hold = BOPHydraulicBatch([
+        build_mvp_for_function(
+            **consts,
+            V_act_m3=V_act_m3,
+            valve_area_m2=valve_area_m2,
+            opening_fun=_OPEN_CLOSED,
+            CdA_leak_m2=float(leak_CdA),
+        )
+        for _, leak_CdA in SCENARIOS
+    ])
+    # every scenario starts from the end of the press run (solver array, no unboxing)
+    y0_hold = np.broadcast_to(sol_press["y"][:, -1], (len(SCENARIOS), 2))
+    t_h, y_hold = _solve_batch(hold, y0_hold, t_hold, t_eval_hold, args)
+
+    results = []
+    for (sc_name, _), y_h in zip(SCENARIOS, y_hold):
+        results.append((f"{fname}_{direction_name}_press_{sc_name}.csv", sol_press["t"], sol_press["y"]))
+        results.append((f"{fname}_{direction_name}_hold_{sc_name}.csv", t_h, y_h))
+
+    for sc_name, bleed_CdA in BLEED_SCENARIOS:
+        y0_bleed = np.full(2, P_supply)
+        sys_bleed = build_mvp_for_function(
+            **consts,
+            V_act_m3=V_act_m3,
+            valve_area_m2=valve_area_m2,
+            opening_fun=_OPEN_CLOSED,
+            CdA_leak_m2=float(bleed_CdA),
+        )
+
+        sol_bleed = integrate_ode(
+            fun=sys_bleed.rhs,
+            y0=y0_bleed,
+            t_span=(0.0, t_bleed),
+            t_eval=t_eval_bleed,
+            method=args.ode_method,
+            rtol=args.rtol,
+            atol=args.atol,
+            verbose=False,
+            t_eval_is_sanitized=True,
+        )
+        results.append((f"{fname}_{direction_name}_bleed_{sc_name}.csv", sol_bleed["t"], sol_bleed["y"]))
+
+    return results
+
+
+_IMPLICIT_METHODS = ("BDF", "Radau", "LSODA")
+
+
+def _solve_batch(batch: BOPHydraulicBatch, y0s, t_end: float, t_eval: np.ndarray, args, use_jac: bool = True):
+    sol = integrate_ode(
+        fun=batch.rhs,
+        y0=batch.stack_states(y0s),
+        t_span=(0.0, t_end),
+        t_eval=t_eval,
+        method=args.ode_method,
+        rtol=args.rtol,
+        atol=args.atol,
+        verbose=False,
+        jac=batch.jac if use_jac and args.ode_method in _IMPLICIT_METHODS else None,
+        t_eval_is_sanitized=True,
+    )
+    return sol["t"], batch.split_states(sol["y"])
+
+
+def _run_batched(jobs, grids, args):
+    """
+    Same runs as _run_one over every job, but each phase (press, hold, bleed)
+    is a single stacked ODE solve over all jobs/scenarios.
+    Returns one result list per job, in _run_one order.
+    """
+    t_eval_press, t_eval_hold, t_eval_bleed = grids
+    results = [[] for _ in jobs]
+
+    # press runs have no leak, so every scenario of a job shares one press curve
+    press = BOPHydraulicBatch([
+        build_mvp_for_function(**consts, V_act_m3=V_act, valve_area_m2=A_valve, opening_fun=_OPEN_STEP_1S)
+        for (consts, _, V_act, A_valve, *_rest) in jobs
+    ])
+    t_p, y_press = _solve_batch(press, [(job[5], job[6]) for job in jobs], float(args.t_press), t_eval_press, args)
+
+    hold_keys = [(j, sc_name, leak_CdA) for j in range(len(jobs)) for sc_name, leak_CdA in SCENARIOS]
+    hold = BOPHydraulicBatch([
+        build_mvp_for_function(
+            **jobs[j][0], V_act_m3=jobs[j][2], valve_area_m2=jobs[j][3],
+            opening_fun=_OPEN_CLOSED, CdA_leak_m2=float(leak_CdA),
+        )
+        for j, _, leak_CdA in hold_keys
+    ])
+    t_h, y_hold = _solve_batch(hold, [y_press[j][:, -1] for j, _, _ in hold_keys], float(args.t_hold), t_eval_hold, args)
+    for (j, sc_name, _), y_h in zip(hold_keys, y_hold):
+        fname, direction_name = jobs[j][1], jobs[j][4]
+        results[j].append((f"{fname}_{direction_name}_press_{sc_name}.csv", t_p, y_press[j]))
+        results[j].append((f"{fname}_{direction_name}_hold_{sc_name}.csv", t_h, y_h))
+
+    bleed_keys = [(j, sc_name, bleed_CdA) for j in range(len(jobs)) for sc_name, bleed_CdA in BLEED_SCENARIOS]
+    bleed = BOPHydraulicBatch([
+        build_mvp_for_function(
+            **jobs[j][0], V_act_m3=jobs[j][2], valve_area_m2=jobs[j][3],
+            opening_fun=_OPEN_CLOSED, CdA_leak_m2=float(bleed_CdA),
+        )
+        for j, _, bleed_CdA in bleed_keys
+    ])
+    # bleed keeps finite differences, as in _run_one
+    t_b, y_bleed = _solve_batch(
+        bleed, [(jobs[j][7], jobs[j][7]) for j, _, _ in bleed_keys], float(args.t_bleed), t_eval_bleed, args, use_jac=False
+    )
+    for (j, sc_name, _), y_b in zip(bleed_keys, y_bleed):
+        fname, direction_name = jobs[j][1], jobs[j][4]
+        results[j].append((f"{fname}_{direction_name}_bleed_{sc_name}.csv", t_b, y_b))
+
+    return results
+
+
+def _write_results(out_dir: Path, fname: str, results, args) -> int:
+    func_dir = out_dir / fname
+    func_dir.mkdir(parents=True, exist_ok=True)
+    # plain string paths: one prefix per function instead of a Path join per file
+    base = str(func_dir) + os.sep
+    headers = ["P_acc_pa", "P_act_pa"]
+    for file_name, t, y in results:
+        stem = base + file_name[: -len(".csv")]
+        if args.format == "npz":
+            export_npz(stem + ".npz", t, y, headers=headers)
+        else:
+            export_csv(stem + ".csv", t, y, headers=headers, fmt=args.csv_fmt)
+            if args.npy:
+                export_npy(stem + ".npy", t, y)
+    return len(results)
+
+
+def _run_and_write(out_dir: Path, job) -> int:
+    # worker entry point: only the file count travels back to the parent
+    return _write_results(out_dir, job[1], _run_one(*job), job[-1])
+
 
-    dt_fast = float(args.dt_fast)
-    dt_hold = float(args.dt_hold)
-    dt_bleed = float(args.dt_bleed)
+def main():
+    args = parse_args()
+    cfg = load_config("configs/ns47.json", convert_to_SI=False)
+    supplies = get_supply_pressures_pa(cfg)
+    consts = system_constants(cfg)
+    cat = get_default_function_catalog_arrays()
 
-    scenarios = [
-        ("healthy", 0.0),
-        ("leak_small", 5e-9),
-        ("leak_big", 5e-8),
-    ]
+    if args.functions:
+        allowed = [str(x).upper() for x in args.functions]
+        cat = cat.select(np.flatnonzero(np.isin(np.char.upper(cat.names), allowed)))
+    if args.max_functions > 0:
+        cat = cat.select(slice(0, int(args.max_functions)))
 
-    bleed_scenarios = [
-        ("bleed", 2e-7),
-    ]
+    out_dir = Path("out/generated")
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-    for fname, spec in cat.items():
-        func_dir = out_dir / fname
-        func_dir.mkdir(parents=True, exist_ok=True)
+    P_ret = supplies["RET"]
+    P_supply_all = [supplies[s] for s in cat.supply.tolist()]
 
-        P_supply = supplies[spec.supply]
-        P_ret = supplies["RET"]
-        direction_setups = []
+    grids = _time_grids(args)
+    jobs = []
+    for i, fname in enumerate(cat.names.tolist()):
+        V_act = float(cat.V_act_m3[i])
+        A_valve = float(cat.valve_area_m2[i])
+        P_supply = P_supply_all[i]
         if "surface_to_well" in args.directions:
-            direction_setups.append(("surface_to_well", P_supply, P_ret))
+            jobs.append((consts, fname, V_act, A_valve, "surface_to_well", P_supply, P_ret, P_supply, grids, args))
         if "well_to_surface" in args.directions:
-            direction_setups.append(("well_to_surface", P_ret, P_supply))
-
-        for direction_name, p_acc0, p_act0 in direction_setups:
-            for sc_name, leak_CdA in scenarios:
-                sys_press = build_mvp_for_function(
-                    cfg,
-                    V_act_m3=spec.V_act_m3,
-                    valve_area_m2=spec.valve_area_m2,
-                    opening_fun=lambda t: opening_step(t, 1.0),
-                    CdA_leak_m2=0.0,
-                )
-
-                y0_press = [p_acc0, p_act0]
-                t_eval_press = np.arange(0.0, t_press + 1e-12, dt_fast)
-
-                sol_press = integrate_ode(
-                    fun=sys_press.rhs,
-                    y0=y0_press,
-                    t_span=(0.0, t_press),
-                    t_eval=t_eval_press,
-                    method=args.ode_method,
-                    rtol=args.rtol,
-                    atol=args.atol,
-                    verbose=False,
-                )
-
-                export_csv(
-                    func_dir / f"{fname}_{direction_name}_press_{sc_name}.csv",
-                    sol_press["t"],
-                    sol_press["y"],
-                    headers=["P_acc_pa", "P_act_pa"],
-                )
-
-                sys_hold = build_mvp_for_function(
-                    cfg,
-                    V_act_m3=spec.V_act_m3,
-                    valve_area_m2=spec.valve_area_m2,
-                    opening_fun=lambda t: 0.0,
-                    CdA_leak_m2=float(leak_CdA),
-                )
-
-                y0_hold = [float(sol_press["y"][0, -1]), float(sol_press["y"][1, -1])]
-                t_eval_hold = np.arange(0.0, t_hold + 1e-12, dt_hold)
-
-                sol_hold = integrate_ode(
-                    fun=sys_hold.rhs,
-                    y0=y0_hold,
-                    t_span=(0.0, t_hold),
-                    t_eval=t_eval_hold,
-                    method=args.ode_method,
-                    rtol=args.rtol,
-                    atol=args.atol,
-                    verbose=False,
-                )
-
-                export_csv(
-                    func_dir / f"{fname}_{direction_name}_hold_{sc_name}.csv",
-                    sol_hold["t"],
-                    sol_hold["y"],
-                    headers=["P_acc_pa", "P_act_pa"],
-                )
-
-            for sc_name, bleed_CdA in bleed_scenarios:
-                y0_bleed = [P_supply, P_supply]
-                sys_bleed = build_mvp_for_function(
-                    cfg,
-                    V_act_m3=spec.V_act_m3,
-                    valve_area_m2=spec.valve_area_m2,
-                    opening_fun=lambda t: 0.0,
-                    CdA_leak_m2=float(bleed_CdA),
-                )
-
-                t_eval_bleed = np.arange(0.0, t_bleed + 1e-12, dt_bleed)
-                sol_bleed = integrate_ode(
-                    fun=sys_bleed.rhs,
-                    y0=y0_bleed,
-                    t_span=(0.0, t_bleed),
-                    t_eval=t_eval_bleed,
-                    method=args.ode_method,
-                    rtol=args.rtol,
-                    atol=args.atol,
-                    verbose=False,
-                )
-
-                export_csv(
-                    func_dir / f"{fname}_{direction_name}_bleed_{sc_name}.csv",
-                    sol_bleed["t"],
-                    sol_bleed["y"],
-                    headers=["P_acc_pa", "P_act_pa"],
-                )
+            jobs.append((consts, fname, V_act, A_valve, "well_to_surface", P_ret, P_supply, P_supply, grids, args))
+
+    # simulations are independent: each worker solves its job and writes its own files
+    n_workers = int(args.jobs) if int(args.jobs) > 0 else (os.cpu_count() or 1)
+    if args.batched and jobs:
+        for job, results in zip(jobs, _run_batched(jobs, grids, args)):
+            _write_results(out_dir, job[1], results, args)
+    elif n_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(jobs))) as pool:
+            list(pool.map(partial(_run_and_write, out_dir), jobs))
+    else:
+        for job in jobs:
+            _run_and_write(out_dir, job)
 
     print("Curvas geradas em: out/generated/<FUNCAO>/")
 
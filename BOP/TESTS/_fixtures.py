@@ -0,0 +1,13 @@
+# tests/_fixtures.py
+import numpy as np
+
+
+def _grid(t_end: float, dt: float) -> np.ndarray:
+    # grade compartilhada entre testes: somente leitura para ninguém alterar a de outro
+    t = np.linspace(0.0, t_end, int(round(t_end / dt)) + 1)
+    t.setflags(write=False)
+    return t
+
+
+T_EVAL_PRESS = _grid(30.0, 0.05)   # pressurização: 30 s a cada 0.05 s
+T_EVAL_HOLD = _grid(300.0, 0.5)    # hold: 5 min a cada 0.5 s
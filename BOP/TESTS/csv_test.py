@@ -1,18 +1,37 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+import numpy as np
+import matplotlib
+
+# uso: python TESTS/csv_test.py [figura.png]  -> com arquivo, salva sem abrir janela (backend Agg)
+out_png = sys.argv[1] if len(sys.argv) > 1 else None
+if out_png is not None:
+    matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("out/ns47_mvp.csv")
+csv_path = Path("out/ns47_mvp.csv")
+npy_path = Path("out/ns47_mvp.npy")
+# companion binário gravado por run_ns47.py (linhas [t, P_acc, P_act]);
+# só vale se não for mais antigo que o CSV, senão é de uma rodada anterior
+if npy_path.exists() and (not csv_path.exists() or npy_path.stat().st_mtime >= csv_path.stat().st_mtime):
+    t_s, P_acc_pa, P_act_pa = np.load(npy_path)
+else:
+    t_s, P_acc_pa, P_act_pa = np.loadtxt(csv_path, delimiter=",", skiprows=1, unpack=True)
 
-df["P_acc_bar"] = df["P_acc_pa"] / 1e5
-df["P_act_bar"] = df["P_act_pa"] / 1e5
+P_acc_bar = P_acc_pa / 1e5
+P_act_bar = P_act_pa / 1e5
 
 plt.figure()
-plt.plot(df["t_s"], df["P_acc_bar"], label="P_acc")
-plt.plot(df["t_s"], df["P_act_bar"], label="P_act")
+plt.plot(t_s, P_acc_bar, label="P_acc")
+plt.plot(t_s, P_act_bar, label="P_act")
 
 plt.xlabel("Tempo (s)")
 plt.ylabel("Pressão (bar)")
 plt.title("NS47 MVP - Pressurização")
 plt.legend()
 plt.grid(True)
-plt.show()
\ No newline at end of file
+if out_png is not None:
+    plt.savefig(out_png)
+else:
+    plt.show()
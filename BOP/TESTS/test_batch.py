@@ -0,0 +1,140 @@
+# tests/test_batch.py
+import numpy as np
+
+from bop_twin.components.valve import OrificeValve, OrificeValveParams, ValveBank
+from bop_twin.core.ode import run_hold_test, run_hold_test_batch
+from bop_twin.criteria.pressure_acceptance_v2 import (
+    PressureTestSpec,
+    evaluate_pressure_test,
+    evaluate_pressure_test_batch,
+)
+from bop_twin.systems.bop_hydraulic import BOPHydraulicBatch, BOPHydraulicMVP, LumpedHydraulicParams
+
+RHO = 1000.0
+
+
+def _random_valve_params(rng, n):
+    # mistura de válvulas com/sem reverso, yield stress, atenuação e limiar de dP
+    return [
+        OrificeValveParams(
+            f"v{i}",
+            area_m2=rng.uniform(1e-5, 2e-4),
+            allow_reverse_flow=bool(rng.integers(2)),
+            reverse_flow_gain=0.5,
+            yield_stress_pa=float(rng.choice([0.0, 10.0])),
+            attenuation_alpha=float(rng.choice([0.0, 0.3])),
+            min_delta_p_pa=float(rng.choice([0.0, 1e3])),
+        )
+        for i in range(n)
+    ]
+
+
+def _random_pressures(rng, n):
+    p_up = rng.uniform(1e5, 3e7, n)
+    p_dn = rng.uniform(1e5, 3e7, n)
+    p_dn[::5] = p_up[::5]  # alguns pontos em equalização
+    return p_up, p_dn
+
+
+def check_valve_bank(rng):
+    params = _random_valve_params(rng, 40)
+    bank = ValveBank(params, RHO)
+    valves = [OrificeValve(p) for p in params]
+    for opening in (0.0, 0.3, 1.0):
+        for _ in range(20):
+            p_up, p_dn = _random_pressures(rng, len(params))
+            q = bank.flow_m3s(p_up, p_dn, opening=opening)
+            g = bank.dflow_ddp(p_up, p_dn, opening=opening)
+            for i, v in enumerate(valves):
+                q_i = v.flow_m3s(p_up[i], p_dn[i], rho=RHO, opening=opening)
+                g_i = v.dflow_ddp(p_up[i], p_dn[i], rho=RHO, opening=opening)
+                assert np.isclose(q[i], q_i, rtol=1e-12, atol=0.0), (i, q[i], q_i)
+                assert np.isclose(g[i], g_i, rtol=1e-12, atol=0.0), (i, g[i], g_i)
+
+
+def check_hydraulic_batch(rng):
+    opening = lambda t: 0.7 if t > 0.5 else 0.0
+    systems = []
+    for vp in _random_valve_params(rng, 40):
+        hp = LumpedHydraulicParams(
+            rho=RHO,
+            bulk_modulus=rng.uniform(1e8, 2e9),
+            V_acc_eff_m3=rng.uniform(1e-3, 0.05),
+            V_act_m3=rng.uniform(1e-3, 0.01),
+            CdA_leak_m2=float(rng.choice([0.0, 1e-8, 5e-8])),
+            gas_volume_fraction=float(rng.choice([0.0, 0.05])),
+            line_resistance_pa_s_per_m3=float(rng.choice([0.0, 1e9, 1e11])),
+            acc_structure_compliance_m3_per_pa=float(rng.choice([0.0, 1e-12])),
+        )
+        systems.append(BOPHydraulicMVP(hp, OrificeValve(vp), opening_fun=opening))
+    batch = BOPHydraulicBatch(systems)
+
+    for t in (0.0, 1.0):
+        for _ in range(20):
+            p_acc, p_act = _random_pressures(rng, len(systems))
+            y = batch.stack_states(np.column_stack([p_acc, p_act]))
+            dy = batch.rhs(t, y)
+            J = batch.jac(t, y)
+            for i, s in enumerate(systems):
+                blk = slice(2 * i, 2 * i + 2)
+                y_i = [p_acc[i], p_act[i]]
+                assert np.allclose(dy[blk], s.rhs(t, y_i), rtol=1e-12, atol=0.0), (i, dy[blk], s.rhs(t, y_i))
+                assert np.allclose(J[blk, blk], s.jac(t, y_i), rtol=1e-10, atol=0.0), (i, J[blk, blk], s.jac(t, y_i))
+            # sistemas independentes: nada fora dos blocos 2x2
+            off = J.copy()
+            for i in range(len(systems)):
+                off[2 * i:2 * i + 2, 2 * i:2 * i + 2] = 0.0
+            assert not np.any(off)
+
+
+def check_hold_test_batch():
+    k = np.array([0.0, 1e-6, 3e-5, 1e-4])  # taxa de queda [1/s]
+    p0 = np.array([200e5, 150e5, 300e5, 207e5])
+    r = run_hold_test_batch(lambda t, p: -k * p, p0)
+    assert r["success"], r["message"]
+    for i in range(len(k)):
+        r_i = run_hold_test(lambda t, p, k_i=k[i]: [-k_i * p[0]], p0[i])
+        assert np.array_equal(r["t"], r_i["t"])
+        assert np.isclose(r["p_end_pa"][i], r_i["p_end_pa"], rtol=1e-5), (i, r["p_end_pa"][i], r_i["p_end_pa"])
+        assert abs(r["delta_p_percent"][i] - r_i["delta_p_percent"]) < 1e-3
+        assert bool(r["pass"][i]) == r_i["pass"]
+
+
+def _same_details(a, b):
+    assert a.keys() == b.keys(), (a.keys(), b.keys())
+    for key in a:
+        if isinstance(a[key], float):
+            assert np.isclose(a[key], b[key], rtol=1e-12), (key, a[key], b[key])
+        else:
+            assert a[key] == b[key], (key, a[key], b[key])
+
+
+def check_pressure_test_batch(rng):
+    t = np.linspace(0.0, 600.0, 601)
+    traces = [
+        300.0 - 2.0 * t / 600.0,         # low ok
+        300.0 - 30.0 * t / 600.0,        # low: queda acima do limite
+        5000.0 - 20.0 * t / 600.0,       # high ok
+        5000.0 - 200.0 * t / 600.0,      # high: queda acima do limite
+    ]
+    P = np.array([p + rng.normal(0.0, 0.5, len(t)) for p in traces])
+    for mode in ("low", "high"):
+        spec = PressureTestSpec(mode=mode)
+        results = evaluate_pressure_test_batch(t, P, spec, designated_pressure_psi=4800.0)
+        for p, res in zip(P, results):
+            ref = evaluate_pressure_test(t, p, spec, designated_pressure_psi=4800.0)
+            assert (res.ok, res.reason) == (ref.ok, ref.reason), (mode, res.reason, ref.reason)
+            _same_details(res.details, ref.details)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    check_valve_bank(rng)
+    check_hydraulic_batch(rng)
+    check_hold_test_batch()
+    check_pressure_test_batch(rng)
+    print("✅ batch == per-case OK (ValveBank, BOPHydraulicBatch, hold test, pressure test)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# tests/test_hold_test.py
+import warnings
+
+import numpy as np
+
+from bop_twin.core.ode import run_hold_test
+
+
+def _rhs_singular(t, p):
+    # explode perto de t = 100.3 s -> o LSODA desiste no meio da grade
+    return [1e7 / (100.3 - t) ** 2]
+
+
+def main():
+    # caminho normal: decaimento lento, grade inteira
+    r = run_hold_test(lambda t, p: [-1e-6 * p[0]], p0_pa=200e5)
+    assert r["success"] and len(r["t"]) == 601, r["message"]
+    assert np.isclose(r["p_end_pa"], 200e5 * np.exp(-300e-6), rtol=1e-5)
+
+    # a grade do hold é cacheada: cada resultado recebe seu próprio "t", gravável
+    r2 = run_hold_test(lambda t, p: [-2e-6 * p[0]], p0_pa=200e5)
+    assert r["t"] is not r2["t"]
+    r2["t"] /= 60.0
+    assert r["t"][-1] == 300.0
+
+    # caminho de falha: odeint deve truncar no último estado alcançado, como o solve_ivp
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        r = run_hold_test(_rhs_singular, p0_pa=200e5)
+    ref = run_hold_test(_rhs_singular, p0_pa=200e5, method="RK45")
+    assert not r["success"]
+    assert len(r["t"]) < 601 and r["t"][-1] <= 100.3, (len(r["t"]), r["t"][-1])
+    assert abs(len(r["t"]) - len(ref["t"])) <= 1, (len(r["t"]), len(ref["t"]))
+    assert 200e5 < r["p_end_pa"] < 1e9, r["p_end_pa"]
+
+    print(f"✅ hold test OK (falha truncada em t={r['t'][-1]:.1f} s, {len(r['t'])} pontos)")
+
+
+if __name__ == "__main__":
+    main()
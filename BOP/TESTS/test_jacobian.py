@@ -0,0 +1,66 @@
+# tests/test_jacobian.py
+import numpy as np
+
+from bop_twin.io.load_config import load_config
+from bop_twin.systems.bop_hydraulic import build_system_from_cfg
+from bop_twin.profiles.commands import step_opening
+
+
+def fd_jacobian(fun, t, y, rel_step=1e-6):
+    y = np.asarray(y, dtype=float)
+    J = np.empty((len(y), len(y)))
+    for j in range(len(y)):
+        h = rel_step * max(abs(y[j]), 1.0)
+        yp = y.copy()
+        ym = y.copy()
+        yp[j] += h
+        ym[j] -= h
+        J[:, j] = (np.asarray(fun(t, yp)) - np.asarray(fun(t, ym))) / (2.0 * h)
+    return J
+
+
+def main():
+    cfg = load_config("configs/ns47.json", convert_to_SI=False)
+    # gás livre no fluido: capacitância dos nós passa a depender da pressão
+    cfg["fluid"]["gas_volume_fraction"] = 0.02
+
+    sys_ = build_system_from_cfg(cfg, opening_fun=step_opening(t_step=0.0, level=1.0), leak_CdA_m2=5e-8)
+
+    # estados longe da equalização (o jac limita a inclinação 1/sqrt(dP) abaixo de 1e4 Pa)
+    states = [
+        [207e5, 2e5],
+        [207e5, 150e5],
+        [50e5, 120e5],
+        [3e5, 1.5e5],
+    ]
+
+    worst = 0.0
+    for y in states:
+        J = sys_.jac(1.0, y)
+        J_fd = fd_jacobian(sys_.rhs, 1.0, y)
+        scale = np.maximum(np.abs(J_fd), 1e-12 * np.max(np.abs(J_fd)))
+        rel = float(np.max(np.abs(J - J_fd) / scale))
+        worst = max(worst, rel)
+        assert rel < 1e-4, f"jac diverge do FD em y={y}: rel={rel:.3e}\n{J}\n{J_fd}"
+
+    # métodos públicos de capacitância/módulo devem bater com o que o rhs usa
+    hp = sys_.hp
+    V_acc = hp.V_acc_eff_m3 + hp.V_acc_line_m3
+    V_act = hp.V_act_m3 + hp.V_act_line_m3
+    for P_acc, P_act in states:
+        C_acc = sys_.node_capacitance_m3_per_pa(V_acc, P_acc, hp.acc_structure_compliance_m3_per_pa)
+        C_act = sys_.node_capacitance_m3_per_pa(V_act, P_act, hp.act_structure_compliance_m3_per_pa)
+        beta_act = sys_.effective_bulk_modulus_pa(P_act)
+        assert np.isclose(C_act, V_act / beta_act + hp.act_structure_compliance_m3_per_pa, rtol=1e-12)
+
+        Q = sys_.valve.flow_m3s(P_acc, P_act, rho=hp.rho, opening=1.0)
+        Q = sys_.apply_line_resistance_limit(Q, P_acc - P_act)
+        expected = np.array([-Q / C_acc, (Q - sys_.leak_flow_m3s(P_act)) / C_act])
+        got = sys_.rhs(1.0, [P_acc, P_act])
+        assert np.allclose(got, expected, rtol=1e-12), f"capacitância pública difere do rhs: {got} vs {expected}"
+
+    print(f"✅ jacobian OK (max rel err vs FD = {worst:.2e})")
+
+
+if __name__ == "__main__":
+    main()
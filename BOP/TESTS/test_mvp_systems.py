@@ -1,11 +1,15 @@
 # tests/test_mvp_systems.py
-import numpy as np
 
 from bop_twin.io.load_config import load_config
 from bop_twin.core.ode import integrate_ode
 from bop_twin.systems.bop_hydraulic import build_system_from_cfg
 from bop_twin.profiles.commands import step_opening
 
+try:
+    from ._fixtures import T_EVAL_HOLD, T_EVAL_PRESS
+except ImportError:  # executado como script: python TESTS/test_mvp_systems.py
+    from _fixtures import T_EVAL_HOLD, T_EVAL_PRESS
+
 
 def main():
     cfg = load_config("configs/ns47.json", convert_to_SI=False)
@@ -17,7 +21,7 @@ def main():
     sys_ok = build_system_from_cfg(cfg, opening_fun=opening, leak_CdA_m2=0.0)
 
     y0 = [207e5, 1e5]  # [P_acc, P_act]
-    t_eval = np.arange(0, 30.0 + 1e-12, 0.05)
+    t_eval = T_EVAL_PRESS
 
     print("🔬 Rodando MVP: acumulador->valvula->atuador")
     sol = integrate_ode(
@@ -39,7 +43,7 @@ def main():
     #    - Avaliamos queda de pressão em P_act
     # ============================================================
     t_end = 5.0 * 60.0
-    t_eval_hold = np.arange(0.0, t_end + 1e-12, 0.5)
+    t_eval_hold = T_EVAL_HOLD
 
     # hold: válvula fechada
     sys_leak_hold = build_system_from_cfg(